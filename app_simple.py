@@ -1,11 +1,19 @@
 # app_simple.py
 import os
+import re
 import streamlit as st
 import pandas as pd
-from preprocessing import preprocess, preprocess_detailed
-from similarity import jaccard_similarity
+from preprocessing import preprocess_with_offsets, parse_query
 from utils import read_file
-from collections import defaultdict
+from indexing import build_index
+from query_cache import QueryCache
+from text_store import TextStore
+from snippets import make_snippet, highlight_terms
+
+PAGE_SIZE = 10
+
+def escape_markdown(text):
+    return re.sub(r'([\\`*_{}\[\]()#+\-.!|>~<$:])', r'\\\1', text)
 
 # Konfigurasi Halaman
 st.set_page_config(
@@ -51,6 +59,19 @@ with st.sidebar:
     
     with st.expander("📜 Lihat Daftar Dokumen"):
         st.write(files)
+    
+    st.markdown("---")
+    st.markdown("### 🔗 Dokumen Serupa")
+    mlt_mode = st.radio("Metode kemiripan", ["jaccard", "bm25"], format_func=str.upper, horizontal=True)
+    mlt_terms = st.number_input("Jumlah stem pembeda (0 = semua)", min_value=0, value=0, step=5,
+                                help="Batasi query dokumen ke stem paling pembeda (tf × idf).")
+    mlt_k = st.slider("Jumlah dokumen serupa", 1, 20, 5)
+    
+    st.markdown("---")
+    st.markdown("### 🔤 Toleransi Salah Ketik")
+    fuzzy_query = st.checkbox("Perluas kata yang tidak dikenal", value=False,
+                              help="Stem query yang tidak ada di kamus maupun di dokumen ditambah kata dasar terdekat (SymSpell).")
+    fuzzy_distance = st.select_slider("Jarak edit maksimal", options=[1, 2], value=2, disabled=not fuzzy_query)
         
     st.markdown("---")
     st.markdown("### Tentang Aplikasi")
@@ -62,13 +83,14 @@ st.title("🔍 Sistem Temu Balik Dokumen")
 st.markdown("### Cari dokumen relevan dengan cepat dan akurat")
 
 # --- PREPROCESSING LOGIC (Cached) ---
-if 'documents' not in st.session_state or st.session_state.get('folder') != folder:
+if 'index' not in st.session_state or st.session_state.get('folder') != folder:
     with st.spinner('🔄 Sedang memproses dokumen... Mohon tunggu sebentar.'):
         st.session_state.folder = folder
-        documents = {}
-        documents_full = {}
-        documents_detailed = {}  # Menyimpan detail preprocessing
-        raw_texts = {}
+        documents_positions = {}  # Token beserta posisi dan offset untuk index frasa/NEAR dan cuplikan
+        if 'text_store' in st.session_state:
+            st.session_state.text_store.close()
+        # Teks dokumen disimpan di disk, hanya potongan untuk cuplikan yang dibaca
+        text_store = TextStore()
         
         progress_bar = st.progress(0)
         
@@ -79,50 +101,55 @@ if 'documents' not in st.session_state or st.session_state.get('folder') != fold
             
             path = os.path.join(folder, file)
             text = read_file(path)
-            raw_texts[file] = text
-            
-            tokens = preprocess(text)
-            detailed = preprocess_detailed(text)
-            documents[file] = [stem for original, stem in tokens]
-            documents_full[file] = tokens
-            documents_detailed[file] = detailed
+            text_store.add(file, text)
+            documents_positions[file] = preprocess_with_offsets(text)
         
-        st.session_state.documents = documents
-        st.session_state.documents_full = documents_full
-        st.session_state.documents_detailed = documents_detailed
-        st.session_state.raw_texts = raw_texts
+        st.session_state.text_store = text_store
+        st.session_state.index = build_index(documents_positions, positions=True, compress=True, offsets=True)
+        st.session_state.query_cache = QueryCache(st.session_state.index)
+        st.session_state.similar_cache = {}
         
         progress_bar.empty()
         st.success(f"✅ Berhasil memproses {len(files)} dokumen!")
 else:
-    documents = st.session_state.documents
-    documents_full = st.session_state.documents_full
-    documents_detailed = st.session_state.documents_detailed
-    raw_texts = st.session_state.raw_texts
+    text_store = st.session_state.text_store
+
+index = st.session_state.index
+query_cache = st.session_state.query_cache
 
 # --- SEARCH UI ---
 col1, col2 = st.columns([4, 1])
 with col1:
-    query = st.text_input("🔎 Masukkan kata kunci pencarian:", placeholder="Contoh: ekonomi digital di indonesia...")
+    query = st.text_input("🔎 Masukkan kata kunci pencarian:", placeholder="Contoh: ekonomi digital di indonesia...",
+                          help='Gunakan tanda kutip untuk frasa ("ekonomi digital") atau NEAR/k untuk kedekatan (ekonomi NEAR/3 digital).')
 with col2:
     st.write("") # Spacer
     st.write("") # Spacer
     search_button = st.button("Cari", type="primary")
 
 if query:
-    # Preprocessing Query
-    query_tokens = preprocess(query)
-    query_stems = [stem for original, stem in query_tokens]
+    # Preprocessing Query (disimpan agar rerun Streamlit tidak memproses ulang query yang sama)
+    from preprocessing import preprocess_query_detailed
+    query_key = (query, fuzzy_query, fuzzy_distance, folder)
+    if st.session_state.get('query_key') != query_key:
+        st.session_state.query_key = query_key
+        # Stem yang sudah ada di index tidak dianggap salah ketik
+        st.session_state.parsed_query = parse_query(query, fuzzy=fuzzy_query, max_distance=fuzzy_distance,
+                                                    vocabulary=index.postings)
+        st.session_state.query_detail = preprocess_query_detailed(query)
+        st.session_state.result_limit = PAGE_SIZE
+        st.session_state.opened_docs = set()
+        st.session_state.similar_to = None
+    parsed_query = st.session_state.parsed_query
+    query_stems = parsed_query['terms']
     
     st.markdown("---")
     st.subheader("📊 Hasil Pencarian")
     
     # Tampilkan Query yang diproses dengan detail SEMUA tahapan preprocessing
     with st.expander("ℹ️ Detail Query (Preprocessing)", expanded=True):
-        from preprocessing import preprocess_query_detailed
-        
         # Dapatkan detail lengkap preprocessing
-        detail = preprocess_query_detailed(query)
+        detail = st.session_state.query_detail
         
         st.markdown("### 📋 Tahapan Preprocessing")
         
@@ -192,81 +219,94 @@ if query:
         final_tokens = [t['stemming_detail']['result'] for t in detail['tokens_detail'] if not t['filtered_out']]
         st.success(f"**Token Hasil Preprocessing:** {final_tokens}")
         st.metric("Jumlah Token Akhir", len(final_tokens))
-
-    # Hitung Similarity
-    results = []
-    for doc_name, doc_stems in documents.items():
-        score = jaccard_similarity(
-            [(w, w) for w in doc_stems],
-            [(w, w) for w in query_stems]
-        )
         
-        relevansi_icon = "⭐⭐⭐" if score > 0.3 else "⭐⭐" if score > 0.1 else "⭐"
-        if score == 0: relevansi_icon = "⚪"
-            
-        results.append({
-            "Dokumen": doc_name,
-            "Skor": score,
-            "Relevansi": relevansi_icon
-        })
-    
-    # Sorting
-    results = sorted(results, key=lambda x: x["Skor"], reverse=True)
-    relevant_results = [r for r in results if r["Skor"] > 0]
+        for phrase in parsed_query['phrases']:
+            st.info(f"Syarat frasa: **\"{' '.join(stem for stem, _ in phrase)}\"**")
+        for stem1, stem2, distance in parsed_query['near']:
+            st.info(f"Syarat kedekatan: **{stem1} NEAR/{distance} {stem2}**")
+        for word, stems in parsed_query['corrections'].items():
+            st.warning(f"`{word}` tidak dikenali, diperluas ke: {', '.join(stems)}")
+
+    # Hitung Similarity lewat index (frasa dan NEAR/k menjadi syarat dokumen),
+    # query yang sama diambil dari cache tanpa menghitung ulang skor
+    ranked = query_cache.search(
+        query_stems,
+        k=len(index),
+        mode="jaccard",
+        phrases=parsed_query['phrases'],
+        near=parsed_query['near']
+    )
+    relevant_results = [(doc_name, score) for doc_name, score in ranked if score > 0]
     
     # Metrics
     m1, m2, m3 = st.columns(3)
     m1.metric("Total Dokumen", len(files))
     m2.metric("Dokumen Relevan", len(relevant_results))
-    m3.metric("Top Score", f"{relevant_results[0]['Skor']:.4f}" if relevant_results else "0.0000")
+    m3.metric("Top Score", f"{relevant_results[0][1]:.4f}" if relevant_results else "0.0000")
     
     if relevant_results:
         st.markdown("### 📄 Daftar Dokumen Relevan")
         
-        for idx, result in enumerate(relevant_results):
-            doc_name = result['Dokumen']
-            score = result['Skor']
+        # Hanya satu halaman hasil yang dirender, sisanya lewat tombol "Muat lebih banyak"
+        limit = st.session_state.result_limit
+        opened_docs = st.session_state.opened_docs
+        query_set = set(query_stems)
+        
+        for idx, (doc_name, score) in enumerate(relevant_results[:limit]):
+            relevansi_icon = "⭐⭐⭐" if score > 0.3 else "⭐⭐" if score > 0.1 else "⭐"
             
             # Card style expander
-            with st.expander(f"#{idx+1} {doc_name} | Skor: {score:.4f} {result['Relevansi']}", expanded=(idx == 0)):
+            similar_open = st.session_state.get('similar_to') == doc_name
+            is_open = idx == 0 or similar_open or doc_name in opened_docs
+            with st.expander(f"#{idx+1} {doc_name} | Skor: {score:.4f} {relevansi_icon}", expanded=is_open):
+                
+                if not is_open:
+                    # Analisis dokumen baru dihitung setelah hasil dibuka
+                    if st.button("📂 Buka Detail", key=f"open_{doc_name}"):
+                        opened_docs.add(doc_name)
+                        is_open = True
+                    else:
+                        st.caption(f"{index.doc_lengths[index.doc_ids[doc_name]]} token, "
+                                   f"{len(index.doc_stems[index.doc_ids[doc_name]])} kata unik")
+                        continue
+                
+                if st.button("🔗 Cari Dokumen Serupa", key=f"mlt_{doc_name}"):
+                    st.session_state.similar_to = doc_name
+                    similar_open = True
+                
+                if similar_open:
+                    # Hasil disimpan agar rerun Streamlit tidak menghitung ulang dokumen serupa
+                    similar_key = (doc_name, mlt_mode, mlt_terms, mlt_k, index.generation)
+                    similar_cache = st.session_state.similar_cache
+                    if similar_key not in similar_cache:
+                        similar_cache[similar_key] = index.more_like_this(doc_name, k=mlt_k, mode=mlt_mode,
+                                                                          max_terms=mlt_terms or None)
+                    similar_docs = similar_cache[similar_key]
+                    st.markdown(f"**Dokumen serupa dengan `{doc_name}` ({mlt_mode.upper()}):**")
+                    if similar_docs:
+                        st.table([{"Dokumen": name, "Skor": round(sim, 4)} for name, sim in similar_docs])
+                    else:
+                        st.caption("Tidak ada dokumen lain yang memiliki kata yang sama.")
                 
                 tab1, tab2, tab3, tab4 = st.tabs(["📜 Cuplikan Teks", "🔍 Analisis Kata", "🧮 Perhitungan Similarity", "ℹ️ Info File"])
                 
                 with tab1:
-                    raw_text = raw_texts.get(doc_name, "")
-                    # Highlight query terms (simple approach)
-                    # Note: This is case sensitive in simple replace, but good enough for visual
-                    display_text = raw_text[:1500] + ("..." if len(raw_text) > 1500 else "")
-                    st.markdown(f"```text\n{display_text}\n```")
-                    st.caption("*Menampilkan 1500 karakter pertama.*")
+                    # Cuplikan di sekitar bagian dokumen yang paling banyak memuat kata query
+                    snippet = make_snippet(index, text_store, doc_name, query_stems)
+                    st.markdown(highlight_terms(snippet, query_stems, before="**:orange[", after="]**", escape=escape_markdown))
+                    st.caption("*Menampilkan bagian teks dengan kata query terbanyak.*")
 
                 with tab2:
-                    detailed_tokens = documents_detailed.get(doc_name, [])
-                    
-                    # Buat mapping untuk menghitung frekuensi berdasarkan stem
-                    stem_mapping = defaultdict(lambda: {'originals': [], 'case_folding': [], 'filtering': [], 'count': 0})
-                    
-                    for detail in detailed_tokens:
-                        stem = detail['stemming']
-                        stem_mapping[stem]['originals'].append(detail['original'])
-                        stem_mapping[stem]['case_folding'].append(detail['case_folding'])
-                        stem_mapping[stem]['filtering'].append(detail['filtering'])
-                        stem_mapping[stem]['count'] += 1
-                    
-                    # Buat data untuk tabel dengan tahapan proses
+                    # Bentuk kata asli per stem sudah disimpan di index saat indexing
                     data = []
-                    for stem, info in stem_mapping.items():
-                        is_match = stem in query_stems
-                        # Ambil contoh pertama untuk setiap tahap
-                        original_examples = sorted(set(info['originals']))
-                        
+                    for stem, (frequency, original_examples) in index.surface_forms(doc_name).items():
                         data.append({
                             "Kata Asli": ", ".join(original_examples[:3]) + ("..." if len(original_examples) > 3 else ""),
                             "Case Folding": original_examples[0].lower(),
                             "Filtering": original_examples[0].lower(),  # sama karena sudah lolos filtering
                             "Stemming": stem,
-                            "Frekuensi": info['count'],
-                            "Match": "✅" if is_match else ""
+                            "Frekuensi": frequency,
+                            "Match": "✅" if stem in query_set else ""
                         })
                     
                     df_analysis = pd.DataFrame(data)
@@ -289,14 +329,11 @@ if query:
                         use_container_width=True,
                         hide_index=True
                     )
-
                 with tab3:
                     st.markdown("### 🧮 Perhitungan Jaccard Similarity")
                     
                     # Ambil set dokumen dan query
-                    doc_stems = documents.get(doc_name, [])
-                    doc_set = set(doc_stems)
-                    query_set = set(query_stems)
+                    doc_set = index.doc_stems[index.doc_ids[doc_name]]
                     
                     # Hitung intersection dan union
                     intersection = doc_set.intersection(query_set)
@@ -367,8 +404,14 @@ if query:
 
                 with tab4:
                     st.write(f"**Nama File:** {doc_name}")
-                    st.write(f"**Ukuran Teks:** {len(raw_texts.get(doc_name, ''))} karakter")
-                    st.write(f"**Jumlah Token:** {len(documents_full.get(doc_name, []))} kata")
+                    st.write(f"**Ukuran Teks:** {text_store.length(doc_name)} karakter")
+                    st.write(f"**Jumlah Token:** {index.doc_lengths[index.doc_ids[doc_name]]} kata")
+        
+        if len(relevant_results) > limit:
+            remaining = len(relevant_results) - limit
+            if st.button(f"⬇️ Muat {min(PAGE_SIZE, remaining)} hasil berikutnya (tersisa {remaining})", key="load_more"):
+                st.session_state.result_limit = limit + PAGE_SIZE
+                st.rerun()
 
     else:
         st.warning("⚠️ Tidak ditemukan dokumen yang cocok dengan kata kunci tersebut.")
@@ -0,0 +1,321 @@
+# benchmark.py
+"""
+Benchmark sederhana untuk komponen temu balik.
+
+Contoh:
+    python benchmark.py postings --folder documents
+    python benchmark.py postings --folder documents/txt --limit 60 --copies 30
+    python benchmark.py stemming --folder documents/txt
+    python benchmark.py streaming --folder documents/txt --size-mb 20
+    python benchmark.py sharding --folder documents/txt --copies 20
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from indexing import DocumentIndex, build_index, index_text_file, intersect_sorted
+from postings import intersect_postings
+from sharding import build_sharded_index
+from preprocessing import preprocess_with_positions, preprocess_with_offsets, case_folding, tokenizing, filtering
+import stemming_ays as stemming_module
+from stemming_ays import (
+    KAMUS, PREFIXES, SUFFIXES,
+    get_inflections, stemming_ays, stemming_ays_rules, stemming_ays_detailed
+)
+from utils import read_file, read_txt
+
+def load_documents(folder, limit=None):
+    documents = {}
+    for root, _, files in os.walk(folder):
+        for file in sorted(files):
+            path = os.path.join(root, file)
+            text = read_file(path)
+            if text:
+                documents[os.path.relpath(path, folder)] = preprocess_with_positions(text)
+            if limit and len(documents) >= limit:
+                return documents
+    return documents
+
+def deep_sizeof(obj, seen=None):
+    """
+    Perkiraan ukuran objek Python beserta isinya (byte).
+    """
+    if seen is None:
+        seen = set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_sizeof(k, seen) + deep_sizeof(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(deep_sizeof(item, seen) for item in obj)
+    return size
+
+def timed(func, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat
+
+def copy_corpus(documents, copies):
+    # Perbesar korpus dengan salinan dokumen (nama berbeda)
+    return {
+        (f"{name}#{copy}" if copy else name): tokens
+        for copy in range(copies) for name, tokens in documents.items()
+    }
+
+def bench_postings(documents, pairs=200, repeat=20, copies=1):
+    documents = copy_corpus(documents, copies)
+    plain = build_index(documents, positions=True)
+    compressed = build_index(documents, positions=True, compress=True)
+
+    plain_size = deep_sizeof(plain.postings) + deep_sizeof(plain.positions)
+    compressed_size = deep_sizeof(compressed.postings) + sum(p.nbytes() for p in compressed.postings.values())
+
+    print(f"Dokumen: {len(plain)}, stem unik: {len(plain.postings)}, token: {plain.total_length}")
+    print("Ukuran postings (frekuensi + posisi):")
+    print(f"  tanpa kompresi : {plain_size / 1024:10.1f} KiB")
+    print(f"  terkompresi    : {compressed_size / 1024:10.1f} KiB ({compressed_size / plain_size:.1%})")
+
+    by_df = sorted(plain.postings, key=plain.doc_freq, reverse=True)
+    blocks = [compressed.postings[stem].num_blocks() for stem in by_df[:500]]
+    print(f"Blok per postings (500 stem tersering): maks {max(blocks)}, rata-rata {sum(blocks) / len(blocks):.1f}")
+
+    # Frekuen x frekuen: kedua postings panjang. Jarang x frekuen: skip pointer
+    # melompati blok postings panjang yang tidak memuat doc_id postings pendek.
+    frequent = by_df[:500]
+    rare = [stem for stem in by_df if plain.doc_freq(stem) >= 2][-500:]
+    rng = random.Random(0)
+    pair_sets = [
+        ("frekuen x frekuen", [tuple(rng.sample(frequent, 2)) for _ in range(pairs)]),
+        ("jarang x frekuen", [(rng.choice(rare), rng.choice(frequent[:50])) for _ in range(pairs)]),
+    ]
+
+    for title, stem_pairs in pair_sets:
+        sorted_lists = {stem: sorted(plain.postings[stem]) for pair in stem_pairs for stem in pair}
+        for a, b in stem_pairs:
+            expected = sorted(set(plain.postings[a]) & set(plain.postings[b]))
+            assert intersect_postings([compressed.postings[a], compressed.postings[b]]) == expected
+
+        def run_sets():
+            for a, b in stem_pairs:
+                set(plain.postings[a]).intersection(plain.postings[b])
+
+        def run_lists():
+            for a, b in stem_pairs:
+                intersect_sorted(sorted_lists[a], sorted_lists[b])
+
+        def run_compressed():
+            for a, b in stem_pairs:
+                intersect_postings([compressed.postings[a], compressed.postings[b]])
+
+        print(f"Intersection {pairs} pasangan {title} (rata-rata per pasangan):")
+        for label, func in [
+            ("dict/set", run_sets),
+            ("list merge", run_lists),
+            ("terkompresi + skip", run_compressed),
+        ]:
+            print(f"  {label:<19}: {timed(func, repeat) / pairs * 1e6:8.2f} µs")
+
+def load_tokens(folder, limit=None):
+    tokens = []
+    count = 0
+    for root, _, files in os.walk(folder):
+        for file in sorted(files):
+            text = read_file(os.path.join(root, file))
+            if text:
+                tokens.extend(filtering(tokenizing(case_folding(text))))
+                count += 1
+            if limit and count >= limit:
+                return tokens
+    return tokens
+
+def baseline_stemming(word):
+    """
+    Salinan beku aturan stemming sebelum tracer ditambahkan, sebagai pembanding
+    bahwa jalur tanpa tracer tidak lebih lambat.
+    """
+    word = word.lower()
+    if word in KAMUS:
+        return word
+
+    temp_word = word
+    for s in SUFFIXES:
+        if temp_word.endswith(s):
+            temp_word = temp_word[:-len(s)]
+            break
+    if temp_word in KAMUS:
+        return temp_word
+    for p in PREFIXES:
+        if temp_word.startswith(p):
+            result = temp_word[len(p):]
+            if result in KAMUS or len(result) > 2:
+                return result
+
+    temp_word = word
+    for p in PREFIXES:
+        if temp_word.startswith(p):
+            temp_word = temp_word[len(p):]
+            break
+    if temp_word in KAMUS:
+        return temp_word
+    for s in SUFFIXES:
+        if temp_word.endswith(s):
+            result = temp_word[:-len(s)]
+            if result in KAMUS or len(result) > 2:
+                return result
+    return temp_word if len(temp_word) >= 3 else word
+
+def bench_stemming(tokens, repeat=7):
+    table = get_inflections()
+    print(f"Token: {len(tokens)}, tabel infleksi: {len(table)} bentuk kata")
+    assert [baseline_stemming(token) for token in tokens] == [stemming_ays_rules(token) for token in tokens]
+    in_table = [token for token in tokens if token not in KAMUS and token in table]
+    not_in_table = [token for token in tokens if token not in KAMUS and token not in table]
+    print(f"  di kamus: {len(tokens) - len(in_table) - len(not_in_table)}, di tabel: {len(in_table)}, "
+          f"lainnya (aturan): {len(not_in_table)}")
+
+    def run(func, words=tokens):
+        return lambda: [func(word) for word in words]
+
+    def without_table(words=tokens):
+        # stemming_ays tanpa tracer dengan tabel infleksi kosong
+        def func():
+            stemming_module.INFLECTIONS = {}
+            try:
+                return [stemming_ays(word) for word in words]
+            finally:
+                stemming_module.INFLECTIONS = table
+        return func
+
+    rows = [
+        ("stemming_ays (tabel + aturan)", tokens, run(stemming_ays)),
+        ("stemming_ays tanpa tabel", tokens, without_table()),
+        ("  hanya kata di tabel", in_table, run(stemming_ays, in_table)),
+        ("  hanya kata di tabel, tanpa tabel", in_table, without_table(in_table)),
+        ("  kata di luar tabel", not_in_table, run(stemming_ays, not_in_table)),
+        ("  kata di luar tabel, tanpa tabel", not_in_table, without_table(not_in_table)),
+        ("stemming_ays_rules", tokens, run(stemming_ays_rules)),
+        ("aturan lama (tanpa tracer)", tokens, run(baseline_stemming)),
+        ("stemming_ays_detailed", tokens, run(stemming_ays_detailed)),
+    ]
+    # Satu putaran pemanasan, lalu baris dijalankan bergiliran setiap putaran agar
+    # semua baris mendapat kondisi cache yang sama; diambil waktu tercepat
+    for _, _, func in rows:
+        func()
+    best = [None] * len(rows)
+    for _ in range(repeat):
+        for i, (_, _, func) in enumerate(rows):
+            elapsed = timed(func, 1)
+            best[i] = elapsed if best[i] is None else min(best[i], elapsed)
+
+    print(f"Stemming (tercepat dari {repeat} putaran bergiliran, per token):")
+    for (label, words, _), elapsed in zip(rows, best):
+        print(f"  {label:<36}: {elapsed / max(len(words), 1) * 1e6:6.2f} µs")
+
+def make_large_text(folder, size_mb):
+    """
+    Gabungkan file .txt di folder berulang-ulang sampai ukurannya size_mb.
+    Returns: path file sementara
+    """
+    paths = [os.path.join(root, f) for root, _, files in os.walk(folder) for f in sorted(files) if f.endswith(".txt")]
+    target = size_mb * 1024 * 1024
+    fd, path = tempfile.mkstemp(suffix=".txt")
+    with os.fdopen(fd, "w", encoding="utf-8") as out:
+        written = 0
+        while written < target:
+            for source in paths:
+                text = read_txt(source) + "\n"
+                out.write(text)
+                written += len(text.encode("utf-8"))
+                if written >= target:
+                    break
+    return path
+
+def measure_peak(func):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+def bench_streaming(folder, size_mb):
+    path = make_large_text(folder, size_mb)
+    try:
+        print(f"File uji: {os.path.getsize(path) / 1024 / 1024:.1f} MiB")
+
+        def full():
+            # Pipeline sama dengan streaming (posisi + offset), hanya cara membaca yang berbeda
+            index = DocumentIndex(positions=True, compress=True)
+            index.add_document("dump", preprocess_with_offsets(read_txt(path)))
+            index.flush()
+            return index
+
+        def streaming():
+            index = DocumentIndex(positions=True, compress=True)
+            index_text_file(index, "dump", path)
+            index.flush()
+            return index
+
+        for label, func in [("baca penuh", full), ("streaming", streaming)]:
+            index, elapsed, peak = measure_peak(func)
+            print(f"  {label:<11}: {elapsed:6.1f} s, memori puncak {peak / 1024 / 1024:7.1f} MiB, "
+                  f"{index.total_length} token")
+    finally:
+        os.remove(path)
+
+def bench_sharding(documents, shard_counts=(1, 2, 4), n_queries=100, copies=1):
+    # Perbesar korpus dengan salinan dokumen agar beban query terasa
+    corpus = copy_corpus(documents, copies)
+    single = build_index(corpus, positions=True, compress=True)
+    frequent = sorted(single.postings, key=single.doc_freq, reverse=True)[:500]
+    rng = random.Random(0)
+    queries = [rng.sample(frequent, rng.randint(1, 4)) for _ in range(n_queries)]
+    print(f"Dokumen: {len(single)}, token: {single.total_length}, CPU: {os.cpu_count()}")
+
+    for mode in ["jaccard", "bm25"]:
+        expected = [single.search(query, k=10, mode=mode) for query in queries]
+        elapsed = timed(lambda: [single.search(query, k=10, mode=mode) for query in queries], 1)
+        print(f"Query {mode.upper()} top-10 (rata-rata per query):")
+        print(f"  {'tanpa shard':<12}: {elapsed / n_queries * 1e3:8.2f} ms")
+        for n_shards in shard_counts:
+            with build_sharded_index(corpus, n_shards=n_shards, positions=True, compress=True) as sharded:
+                assert [sharded.search(query, k=10, mode=mode) for query in queries] == expected
+                elapsed = timed(lambda: [sharded.search(query, k=10, mode=mode) for query in queries], 1)
+            print(f"  {f'{n_shards} shard':<12}: {elapsed / n_queries * 1e3:8.2f} ms")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark sistem temu balik dokumen")
+    parser.add_argument("section", choices=["postings", "stemming", "streaming", "sharding"])
+    parser.add_argument("--folder", default="documents")
+    parser.add_argument("--limit", type=int, default=None, help="Batasi jumlah dokumen")
+    parser.add_argument("--size-mb", type=int, default=20, help="Ukuran file uji untuk streaming")
+    parser.add_argument("--copies", type=int, default=1, help="Salinan korpus (postings dan sharding)")
+    args = parser.parse_args()
+
+    if args.section == "streaming":
+        bench_streaming(args.folder, args.size_mb)
+        return
+
+    if args.section == "stemming":
+        bench_stemming(load_tokens(args.folder, args.limit))
+        return
+
+    start = time.perf_counter()
+    documents = load_documents(args.folder, args.limit)
+    print(f"Preprocessing {len(documents)} dokumen: {time.perf_counter() - start:.1f} s")
+
+    if args.section == "postings":
+        bench_postings(documents, copies=args.copies)
+    elif args.section == "sharding":
+        bench_sharding(documents, copies=args.copies)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,397 @@
+import heapq
+from collections import defaultdict
+from functools import partial
+from itertools import accumulate
+
+from postings import CompressedPostings, PositionsBuffer, TokenOffsets, intersect_postings
+from similarity import bm25_idf, bm25_term_score
+
+def delta_encode(positions):
+    """
+    Ubah list posisi terurut menjadi selisih antar posisi: [3, 7, 12] -> [3, 4, 5]
+    """
+    previous = 0
+    deltas = []
+    for position in positions:
+        deltas.append(position - previous)
+        previous = position
+    return deltas
+
+def delta_decode(deltas):
+    return list(accumulate(deltas))
+
+def intersect_sorted(list1, list2):
+    """
+    Irisan dua list terurut dengan merge dua pointer.
+    """
+    result = []
+    i = j = 0
+    while i < len(list1) and j < len(list2):
+        if list1[i] == list2[j]:
+            result.append(list1[i])
+            i += 1
+            j += 1
+        elif list1[i] < list2[j]:
+            i += 1
+        else:
+            j += 1
+    return result
+
+def count_within(list1, list2, distance):
+    """
+    Hitung pasangan posisi (a, b) dengan |a - b| <= distance, dengan merge dua pointer.
+    """
+    count = 0
+    start = 0
+    for a in list1:
+        while start < len(list2) and list2[start] < a - distance:
+            start += 1
+        j = start
+        while j < len(list2) and list2[j] <= a + distance:
+            count += 1
+            j += 1
+    return count
+
+class DocumentIndex:
+    """
+    Inverted index sederhana: stem -> {doc_id: frekuensi}
+    Dokumen disimpan dengan ID integer, nama dokumen dipetakan lewat doc_ids.
+    Jika positions=True, posisi token per stem per dokumen juga disimpan
+    (delta-encoded) untuk query frasa dan NEAR/k.
+    Jika compress=True, postings disimpan sebagai CompressedPostings
+    (varint + delta per blok dengan skip pointer).
+    Jika offsets=True, offset karakter setiap posisi token juga disimpan
+    (TokenOffsets) untuk mengambil cuplikan teks dari TextStore.
+    generation bertambah setiap isi index berubah (dipakai QueryCache).
+    """
+
+    def __init__(self, positions=False, compress=False, offsets=False):
+        self.store_positions = positions
+        self.store_offsets = offsets
+        self.compress = compress
+        if compress:
+            self.postings = defaultdict(partial(CompressedPostings, positions))
+        else:
+            self.postings = defaultdict(dict)
+        self.positions = defaultdict(dict)
+        self.doc_names = []
+        self.doc_ids = {}
+        self.doc_stems = []
+        self.doc_forms = []
+        self.doc_offsets = []
+        self.doc_lengths = []
+        self.total_length = 0
+        self.generation = 0
+
+    def __len__(self):
+        return len(self.doc_names)
+
+    def __contains__(self, name):
+        return name in self.doc_ids
+
+    def add_document(self, name, tokens):
+        """
+        Tambahkan dokumen ke index.
+        tokens: list/iterable of tuples (original_word, stemmed_word) hasil preprocess,
+                atau (original_word, stemmed_word, position) hasil preprocess_with_positions,
+                atau (original_word, stemmed_word, position, offset) hasil preprocess_with_offsets
+                (wajib jika index dibangun dengan offsets=True).
+                Token hanya dibaca sekali, sehingga generator (preprocess_stream) bisa dipakai.
+        """
+        if name in self.doc_ids:
+            raise ValueError(f"Dokumen '{name}' sudah ada di index")
+
+        # Index baru diubah setelah semua token terbaca, sehingga token yang tidak
+        # valid (atau error dari generator) tidak meninggalkan dokumen setengah jadi
+        doc_id = len(self.doc_names)
+        length = 0
+        counts = defaultdict(int)
+        forms = defaultdict(set)
+        # Index terkompresi langsung meng-encode posisi agar dokumen besar tetap hemat memori
+        stem_positions = defaultdict(PositionsBuffer if self.compress else list)
+        token_offsets = TokenOffsets() if self.store_offsets else None
+        for i, token in enumerate(tokens):
+            stem = token[1]
+            counts[stem] += 1
+            forms[stem].add(token[0])
+            position = token[2] if len(token) > 2 else i
+            if self.store_positions:
+                stem_positions[stem].append(position)
+            if token_offsets is not None:
+                if len(token) < 4:
+                    raise ValueError("Index dengan offsets=True membutuhkan token hasil preprocess_with_offsets")
+                token_offsets.add(position, token[3])
+            length += 1
+
+        self.doc_names.append(name)
+        self.doc_ids[name] = doc_id
+        for stem, tf in counts.items():
+            if self.compress:
+                encoded = stem_positions[stem].getvalue() if self.store_positions else None
+                self.postings[stem].append_encoded(doc_id, tf, encoded)
+            else:
+                self.postings[stem][doc_id] = tf
+                if self.store_positions:
+                    self.positions[stem][doc_id] = delta_encode(stem_positions[stem])
+
+        self.doc_stems.append(frozenset(counts))
+        self.doc_forms.append({stem: (tf, tuple(sorted(forms[stem]))) for stem, tf in counts.items()})
+        if token_offsets is not None:
+            self.doc_offsets.append(token_offsets)
+        self.doc_lengths.append(length)
+        self.total_length += length
+        self.generation += 1
+        return doc_id
+
+    def add_documents(self, documents):
+        """
+        Tambahkan banyak dokumen sekaligus dari dict {nama_dokumen: tokens}, lalu flush.
+        Returns: list doc_id
+        """
+        try:
+            return [self.add_document(name, tokens) for name, tokens in documents.items()]
+        finally:
+            self.flush()
+
+    def flush(self):
+        """
+        Kompres sisa tail semua postings (dipanggil setelah selesai menambah dokumen).
+        """
+        if self.compress:
+            for doc_postings in self.postings.values():
+                doc_postings.flush()
+
+    def surface_forms(self, name):
+        """
+        Bentuk kata asli setiap stem di sebuah dokumen. Frekuensi disimpan bersama
+        bentuk kata saat indexing, sehingga postings (terkompresi) tidak perlu di-decode.
+        Returns: dict {stem: (frekuensi, tuple kata asli terurut)}
+        """
+        return dict(self.doc_forms[self.doc_ids[name]])
+
+    def document_stems(self, name):
+        return self.doc_stems[self.doc_ids[name]]
+
+    def doc_freq(self, stem):
+        return len(self.postings.get(stem, ()))
+
+    def doc_freqs(self, stems=None):
+        # Tanpa stems: df seluruh kosakata index
+        if stems is None:
+            return {stem: len(doc_postings) for stem, doc_postings in self.postings.items() if doc_postings}
+        return {stem: self.doc_freq(stem) for stem in stems}
+
+    def document_lengths(self, names):
+        """
+        Returns: dict {nama_dokumen: jumlah token} untuk nama yang ada di index
+        """
+        return {name: self.doc_lengths[self.doc_ids[name]] for name in names if name in self.doc_ids}
+
+    def collection_stats(self, stems=()):
+        """
+        Statistik koleksi untuk BM25: (jumlah dokumen, rata-rata panjang, {stem: df}).
+        Index yang dipecah (ShardedIndex) menjumlahkan statistik semua shard lalu
+        mengirimkannya sebagai stats agar skor sama dengan index tunggal.
+        """
+        return (len(self.doc_names), self.avg_doc_length(), self.doc_freqs(stems))
+
+    def get_positions(self, stem, doc_id):
+        """
+        Posisi token sebuah stem di dokumen (sudah di-decode, terurut).
+        """
+        if self.compress:
+            doc_postings = self.postings.get(stem)
+            return doc_postings.positions(doc_id) if doc_postings is not None else []
+        deltas = self.positions.get(stem, {}).get(doc_id)
+        return delta_decode(deltas) if deltas else []
+
+    def token_offset(self, name, position):
+        """
+        Offset karakter awal token pada posisi tertentu di teks asli dokumen.
+        """
+        if not self.store_offsets:
+            raise ValueError("Index dibangun tanpa offset karakter")
+        return self.doc_offsets[self.doc_ids[name]][position]
+
+    def _candidates(self, stems):
+        # Dokumen yang mengandung semua stem, mulai dari postings terpendek
+        ordered = sorted(stems, key=self.doc_freq)
+        if not ordered:
+            return set()
+        if self.compress:
+            if any(stem not in self.postings for stem in ordered):
+                return []
+            return intersect_postings([self.postings[stem] for stem in ordered])
+        candidates = set(self.postings.get(ordered[0], ()))
+        for stem in ordered[1:]:
+            if not candidates:
+                break
+            candidates.intersection_update(self.postings.get(stem, ()))
+        return candidates
+
+    def phrase_matches(self, phrase):
+        """
+        Cari dokumen yang memuat frasa.
+        phrase: list of (stem, offset), offset = jarak posisi dari kata pertama frasa
+        Returns: dict {doc_id: jumlah kemunculan frasa}
+        """
+        self._require_positions()
+        matches = {}
+        for doc_id in self._candidates([stem for stem, _ in phrase]):
+            starts = None
+            for stem, offset in phrase:
+                shifted = [p - offset for p in self.get_positions(stem, doc_id)]
+                starts = shifted if starts is None else intersect_sorted(starts, shifted)
+                if not starts:
+                    break
+            if starts:
+                matches[doc_id] = len(starts)
+        return matches
+
+    def near_matches(self, stem1, stem2, distance):
+        """
+        Cari dokumen di mana stem1 dan stem2 muncul dalam jarak <= distance posisi.
+        Returns: dict {doc_id: jumlah pasangan yang berdekatan}
+        """
+        self._require_positions()
+        matches = {}
+        for doc_id in self._candidates([stem1, stem2]):
+            count = count_within(
+                self.get_positions(stem1, doc_id),
+                self.get_positions(stem2, doc_id),
+                distance
+            )
+            if count:
+                matches[doc_id] = count
+        return matches
+
+    def _require_positions(self):
+        if not self.store_positions:
+            raise ValueError("Index dibangun tanpa posisi, query frasa/NEAR tidak didukung")
+
+    def avg_doc_length(self):
+        return self.total_length / len(self.doc_names) if self.doc_names else 0.0
+
+    def _jaccard_scores(self, query_set, exclude=None):
+        # Hitung irisan lewat postings, hanya dokumen yang punya kata query yang disentuh
+        overlap = defaultdict(int)
+        for stem in query_set:
+            for doc_id in self.postings.get(stem, ()):
+                overlap[doc_id] += 1
+        overlap.pop(exclude, None)
+
+        query_size = len(query_set)
+        return {
+            doc_id: count / (query_size + len(self.doc_stems[doc_id]) - count)
+            for doc_id, count in overlap.items()
+        }
+
+    def _bm25_scores(self, query_set, exclude=None, stats=None):
+        n_docs, avg_len, doc_freqs = stats or self.collection_stats()
+        scores = defaultdict(float)
+        # Urutan stem tetap agar penjumlahan skor sama di setiap proses
+        for stem in sorted(query_set):
+            doc_postings = self.postings.get(stem)
+            if not doc_postings:
+                continue
+            idf = bm25_idf(doc_freqs.get(stem, len(doc_postings)), n_docs)
+            for doc_id, tf in doc_postings.items():
+                scores[doc_id] += bm25_term_score(tf, idf, self.doc_lengths[doc_id], avg_len)
+        scores.pop(exclude, None)
+        return scores
+
+    def _top_k(self, scores, k):
+        top = heapq.nlargest(k, scores.items(), key=lambda item: (item[1], -item[0]))
+        return [(self.doc_names[doc_id], score) for doc_id, score in top if score > 0]
+
+    def search(self, query_stems, k=10, mode="jaccard", phrases=(), near=(), stats=None):
+        """
+        Cari dokumen berdasarkan list stem query.
+        mode: 'jaccard' atau 'bm25'
+        phrases, near: batasan frasa dan NEAR/k dari parse_query; hanya dokumen
+                       yang memenuhi semua batasan yang dikembalikan
+        stats: statistik koleksi global dari collection_stats (untuk shard)
+        Returns: list of tuples (nama_dokumen, skor), terurut dari skor tertinggi
+        """
+        query_set = set(query_stems)
+        if mode == "jaccard":
+            scores = self._jaccard_scores(query_set)
+        elif mode == "bm25":
+            scores = self._bm25_scores(query_set, stats=stats)
+        else:
+            raise ValueError(f"Mode ranking tidak dikenal: {mode}")
+
+        for phrase in phrases:
+            allowed = self.phrase_matches(phrase)
+            scores = {doc_id: score for doc_id, score in scores.items() if doc_id in allowed}
+        for stem1, stem2, distance in near:
+            allowed = self.near_matches(stem1, stem2, distance)
+            scores = {doc_id: score for doc_id, score in scores.items() if doc_id in allowed}
+        return self._top_k(scores, k)
+
+    def discriminative_stems(self, name, max_terms, stats=None):
+        """
+        Ambil stem paling pembeda dari sebuah dokumen (bobot tf * idf).
+        tf diambil dari doc_forms agar postings (terkompresi) tidak perlu di-decode.
+        """
+        doc_id = self.doc_ids[name]
+        n_docs, _, doc_freqs = stats or self.collection_stats()
+        weighted = [
+            (tf * bm25_idf(doc_freqs.get(stem, len(self.postings[stem])), n_docs), stem)
+            for stem, (tf, _) in self.doc_forms[doc_id].items()
+        ]
+        return [stem for _, stem in heapq.nlargest(max_terms, weighted)]
+
+    def more_like_this(self, name, k=10, mode="jaccard", max_terms=None):
+        """
+        Cari dokumen yang mirip dengan dokumen yang sudah ada di index.
+        max_terms: jika diisi, hanya stem paling pembeda yang dipakai sebagai query
+        Returns: list of tuples (nama_dokumen, skor) tanpa dokumen sumber
+        """
+        source_set = self.doc_stems[self.doc_ids[name]]
+        query_set = set(self.discriminative_stems(name, max_terms)) if max_terms else source_set
+        return self.search_similar(source_set, query_set, k=k, mode=mode, exclude=name)
+
+    def search_similar(self, source_set, query_set, k=10, mode="jaccard", exclude=None, stats=None):
+        """
+        Cari dokumen yang mirip dengan himpunan stem source_set; kandidat diambil
+        dari postings stem query_set (boleh sama dengan source_set).
+        exclude: nama dokumen yang tidak ikut dikembalikan (dokumen sumber)
+        Returns: list of tuples (nama_dokumen, skor)
+        """
+        exclude_id = self.doc_ids.get(exclude)
+        if mode == "jaccard":
+            scores = self._jaccard_scores(query_set, exclude=exclude_id)
+            if query_set != source_set:
+                # Stem dipangkas: kandidat dari postings, skor tetap Jaccard penuh
+                scores = {
+                    cand: len(source_set & self.doc_stems[cand]) / len(source_set | self.doc_stems[cand])
+                    for cand in scores
+                }
+        elif mode == "bm25":
+            scores = self._bm25_scores(query_set, exclude=exclude_id, stats=stats)
+        else:
+            raise ValueError(f"Mode ranking tidak dikenal: {mode}")
+        return self._top_k(scores, k)
+
+def index_text_file(index, name, path, chunk_size=1 << 20, store=None):
+    """
+    Tambahkan file .txt berukuran besar ke index secara streaming: file dibaca
+    per chunk dan token mengalir langsung ke indexer tanpa menampung seluruh teks.
+    store: TextStore opsional, teks ikut ditulis ke sana sambil dibaca
+    """
+    from preprocessing import preprocess_stream
+    from utils import stream_txt
+
+    chunks = stream_txt(path, chunk_size)
+    if store is not None:
+        chunks = store.add_stream(name, chunks)
+    return index.add_document(name, preprocess_stream(chunks))
+
+def build_index(documents, positions=False, compress=False, offsets=False):
+    """
+    Bangun DocumentIndex dari dict {nama_dokumen: list token hasil preprocess}
+    """
+    index = DocumentIndex(positions=positions, compress=compress, offsets=offsets)
+    index.add_documents(documents)
+    return index
@@ -0,0 +1,98 @@
+# inflection.py
+"""
+Generator tabel infleksi untuk stemming_ays.
+
+Setiap kata dasar di kamus.txt dikombinasikan dengan prefix/suffix yang dikenal
+stemmer (prefix saja, suffix saja, prefix + suffix). Sebuah bentuk kata disimpan
+hanya jika aturan stemming (stemming_ays_rules) mengembalikan kata dasar itu
+sendiri, sehingga jawaban tabel selalu sama dengan hasil aturan; bentuk kata yang
+bertabrakan antar kata dasar otomatis mengikuti hasil aturan.
+
+Agar ukuran tabel tetap wajar, hanya kombinasi yang lazim dalam bahasa Indonesia
+yang dibangkitkan: prefix nasal dipilih sesuai huruf awal kata dasar, pasangan
+prefix + suffix dibatasi pada konfiks yang umum, dan partikel setelah prefix hanya
+-nya. Bentuk lain tetap ditangani aturan stemming seperti biasa.
+
+Jalankan sekali (dan ulangi setiap kamus.txt berubah):
+    python inflection.py
+"""
+import pickle
+import time
+
+from stemming_ays import (
+    KAMUS, PREFIXES, SUFFIXES, INFLECTIONS_PATH,
+    inflection_signature, stemming_ays_rules
+)
+
+VOWELS = 'aeiou'
+
+# Huruf awal kata dasar yang lazim untuk setiap varian prefix nasal
+NASAL_INITIALS = {
+    'meng': VOWELS + 'ghk', 'peng': VOWELS + 'ghk',
+    'meny': VOWELS,
+    'men': 'cdjtz', 'pen': 'cdjtz',
+    'mem': 'bfpv', 'pem': 'bfpv',
+    'me': 'lmnrwy', 'pe': 'lmnrwy',
+}
+
+# Suffix yang lazim dipasangkan dengan setiap prefix (konfiks)
+CONFIXES = {
+    'me': {'kan', 'i'},
+    'pe': {'an'},
+    'ber': {'an', 'kan'},
+    'per': {'an', 'kan', 'i'},
+    'di': {'kan', 'i'},
+    'ke': {'an'},
+    'se': {'nya'},
+    'ter': {'kan', 'i'},
+}
+
+PARTICLES_AFTER_PREFIX = {'nya'}
+
+def prefix_group(prefix):
+    # meng/meny/men/mem/me -> me, peng/pen/pem/pe -> pe
+    if prefix.startswith('me'):
+        return 'me'
+    if prefix.startswith('pe') and prefix != 'per':
+        return 'pe'
+    return prefix
+
+def candidate_forms(root):
+    """
+    Bentuk kata berimbuhan yang lazim untuk satu kata dasar.
+    """
+    for suffix in SUFFIXES:
+        yield root + suffix
+    for prefix in PREFIXES:
+        initials = NASAL_INITIALS.get(prefix)
+        if initials is not None and root[0] not in initials:
+            continue
+        yield prefix + root
+        allowed = CONFIXES.get(prefix_group(prefix), set()) | PARTICLES_AFTER_PREFIX
+        for suffix in SUFFIXES:
+            if suffix in allowed:
+                yield prefix + root + suffix
+
+def build_inflection_table(roots=KAMUS):
+    """
+    Returns: (dict {bentuk_kata: kata_dasar}, jumlah bentuk kata yang dicoba)
+    """
+    table = {}
+    tried = 0
+    for root in roots:
+        for form in candidate_forms(root):
+            tried += 1
+            if form not in KAMUS and stemming_ays_rules(form) == root:
+                table[form] = root
+    return table, tried
+
+def save_inflection_table(table, path=INFLECTIONS_PATH):
+    with open(path, 'wb') as f:
+        pickle.dump((inflection_signature(), table), f, protocol=pickle.HIGHEST_PROTOCOL)
+
+if __name__ == "__main__":
+    start = time.perf_counter()
+    table, tried = build_inflection_table()
+    save_inflection_table(table)
+    print(f"Tabel infleksi: {len(table)} dari {tried} bentuk kata "
+          f"({time.perf_counter() - start:.1f} s) -> {INFLECTIONS_PATH}")
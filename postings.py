@@ -0,0 +1,435 @@
+from array import array
+from bisect import bisect_left, bisect_right
+from itertools import accumulate
+
+BLOCK_SIZE = 128
+
+def encode_varint(value, out):
+    """
+    Tulis bilangan bulat non-negatif sebagai variable-byte ke bytearray out
+    (7 bit per byte, bit tertinggi = masih ada byte lanjutan).
+    """
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+def decode_varints(data, pos, count):
+    """
+    Baca count bilangan variable-byte mulai dari data[pos].
+    Returns: (list nilai, posisi byte setelahnya)
+    """
+    # Jalur cepat: semua nilai muat dalam satu byte (umum untuk selisih doc_id dan tf)
+    chunk = data[pos:pos + count]
+    if len(chunk) == count and (not count or max(chunk) < 0x80):
+        return list(chunk), pos + count
+
+    values = []
+    append = values.append
+    for _ in range(count):
+        byte = data[pos]
+        pos += 1
+        if byte < 0x80:
+            append(byte)
+            continue
+        value = byte & 0x7F
+        shift = 7
+        while True:
+            byte = data[pos]
+            pos += 1
+            value |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                break
+            shift += 7
+        append(value)
+    return values, pos
+
+def encode_positions(positions):
+    """
+    Posisi terurut -> bytes berisi selisih posisi dalam variable-byte.
+    """
+    out = bytearray()
+    last = 0
+    for position in positions:
+        encode_varint(position - last, out)
+        last = position
+    return bytes(out)
+
+class PositionsBuffer:
+    """
+    Penampung posisi yang langsung di-encode (delta varint) saat ditambahkan.
+    """
+
+    def __init__(self):
+        self.data = bytearray()
+        self.last = 0
+
+    def append(self, position):
+        encode_varint(position - self.last, self.data)
+        self.last = position
+
+    def getvalue(self):
+        return bytes(self.data)
+
+def decode_positions(data, pos, count):
+    deltas, _ = decode_varints(data, pos, count)
+    positions = []
+    position = 0
+    for delta in deltas:
+        position += delta
+        positions.append(position)
+    return positions
+
+def skip_varints(data, pos, count):
+    # Lewati count bilangan tanpa menyimpan nilainya
+    for _ in range(count):
+        while data[pos] >= 0x80:
+            pos += 1
+        pos += 1
+    return pos
+
+class CompressedPostings:
+    """
+    Postings list satu stem dalam bentuk terkompresi.
+
+    Dokumen disimpan per blok (maksimal BLOCK_SIZE entri). Setiap blok berisi
+    selisih doc_id (varint), lalu frekuensi (varint), lalu posisi token per dokumen
+    (delta varint, jika with_positions). Skip pointer (doc_id terakhir dan offset
+    byte tiap blok) dipakai untuk melompat langsung ke blok yang tepat. Entri
+    terbaru ditampung di tail yang belum terkompresi sampai penuh satu blok atau
+    sampai flush().
+    """
+
+    def __init__(self, with_positions=False):
+        self.with_positions = with_positions
+        self.data = bytearray()
+        self.block_last = array('I')
+        self.block_offsets = array('I')
+        self.block_sizes = array('H')
+        self.tail_docs = []
+        self.tail_tfs = []
+        self.tail_positions = []
+        self.count = 0
+        self._cached_block = None
+        self._cached_docs = None
+        self._cached_tfs_block = None
+        self._cached_tfs = None
+
+    def append(self, doc_id, tf, positions=None):
+        """
+        Tambahkan satu dokumen; doc_id harus lebih besar dari doc_id sebelumnya.
+        """
+        encoded = encode_positions(positions) if self.with_positions else None
+        self.append_encoded(doc_id, tf, encoded)
+
+    def append_encoded(self, doc_id, tf, encoded_positions=None):
+        """
+        Seperti append, tetapi posisi sudah dalam bentuk encode_positions
+        (dipakai indexer streaming agar posisi tidak perlu ditampung sebagai list).
+        """
+        if self.count and doc_id <= self.last_doc():
+            raise ValueError("doc_id harus ditambahkan secara terurut naik")
+        self.tail_docs.append(doc_id)
+        self.tail_tfs.append(tf)
+        if self.with_positions:
+            self.tail_positions.append(encoded_positions)
+        self.count += 1
+        if len(self.tail_docs) == BLOCK_SIZE:
+            self.flush()
+
+    def flush(self):
+        """
+        Kompres isi tail menjadi blok (boleh kurang dari BLOCK_SIZE entri).
+        """
+        if not self.tail_docs:
+            return
+        previous = self.block_last[-1] if self.block_last else 0
+        self.block_offsets.append(len(self.data))
+        for doc_id in self.tail_docs:
+            encode_varint(doc_id - previous, self.data)
+            previous = doc_id
+        for tf in self.tail_tfs:
+            encode_varint(tf, self.data)
+        for encoded in self.tail_positions:
+            self.data += encoded
+        self.block_last.append(previous)
+        self.block_sizes.append(len(self.tail_docs))
+        self.tail_docs = []
+        self.tail_tfs = []
+        self.tail_positions = []
+
+    def last_doc(self):
+        if self.tail_docs:
+            return self.tail_docs[-1]
+        return self.block_last[-1]
+
+    def num_blocks(self):
+        return len(self.block_last) + (1 if self.tail_docs else 0)
+
+    def block_max(self, block):
+        if block < len(self.block_last):
+            return self.block_last[block]
+        return self.tail_docs[-1]
+
+    def decode_docs(self, block):
+        """
+        Decode doc_id satu blok saja (cukup untuk seek dan intersection).
+        Returns: (list doc_id, offset byte awal bagian frekuensi)
+        """
+        if block == len(self.block_last):
+            return self.tail_docs, None
+        if block == self._cached_block:
+            return self._cached_docs
+
+        deltas, pos = decode_varints(self.data, self.block_offsets[block], self.block_sizes[block])
+        docs = list(accumulate(deltas, initial=self.block_last[block - 1] if block else 0))
+        del docs[0]
+
+        self._cached_block = block
+        self._cached_docs = (docs, pos)
+        return self._cached_docs
+
+    def decode_block(self, block):
+        """
+        Decode doc_id dan frekuensi satu blok.
+        Returns: (list doc_id, list frekuensi, offset byte awal bagian posisi)
+        """
+        docs, pos = self.decode_docs(block)
+        if pos is None:
+            return docs, self.tail_tfs, None
+        if block != self._cached_tfs_block:
+            self._cached_tfs_block = block
+            self._cached_tfs = decode_varints(self.data, pos, len(docs))
+        tfs, pos = self._cached_tfs
+        return docs, tfs, pos
+
+    def find_block(self, doc_id, start=0):
+        """
+        Blok pertama (mulai dari start) yang doc_id terakhirnya >= doc_id.
+        Menggunakan galloping: lompatan 1, 2, 4, ... lalu binary search.
+        """
+        n_blocks = self.num_blocks()
+        if start >= n_blocks or self.block_max(start) >= doc_id:
+            return start
+        low = start
+        step = 1
+        high = start + step
+        while high < n_blocks and self.block_max(high) < doc_id:
+            low = high
+            step *= 2
+            high = start + step
+        full_blocks = len(self.block_last)
+        block = bisect_left(self.block_last, doc_id, low + 1, min(high, full_blocks))
+        if block == full_blocks and self.tail_docs and self.tail_docs[-1] < doc_id:
+            return n_blocks
+        return block
+
+    def _locate(self, doc_id):
+        block = self.find_block(doc_id)
+        if block >= self.num_blocks():
+            return None
+        docs = self.decode_docs(block)[0]
+        i = bisect_left(docs, doc_id)
+        if i < len(docs) and docs[i] == doc_id:
+            return block, i
+        return None
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        for block in range(self.num_blocks()):
+            yield from self.decode_docs(block)[0]
+
+    def items(self):
+        for block in range(self.num_blocks()):
+            docs, tfs, _ = self.decode_block(block)
+            yield from zip(docs, tfs)
+
+    def __contains__(self, doc_id):
+        return self._locate(doc_id) is not None
+
+    def get(self, doc_id, default=None):
+        found = self._locate(doc_id)
+        if found is None:
+            return default
+        block, i = found
+        return self.decode_block(block)[1][i]
+
+    def __getitem__(self, doc_id):
+        tf = self.get(doc_id)
+        if tf is None:
+            raise KeyError(doc_id)
+        return tf
+
+    def positions(self, doc_id):
+        """
+        Posisi token di dokumen doc_id (sudah di-decode), [] jika tidak ada.
+        """
+        if not self.with_positions:
+            raise ValueError("Postings ini tidak menyimpan posisi")
+        found = self._locate(doc_id)
+        if found is None:
+            return []
+        block, i = found
+        docs, tfs, pos = self.decode_block(block)
+        if pos is None:
+            return decode_positions(self.tail_positions[i], 0, tfs[i])
+        pos = skip_varints(self.data, pos, sum(tfs[:i]))
+        return decode_positions(self.data, pos, tfs[i])
+
+    def nbytes(self):
+        """
+        Perkiraan ukuran data postings (byte), termasuk skip pointer dan tail.
+        """
+        tail = 4 * (len(self.tail_docs) + len(self.tail_tfs)) + sum(len(p) for p in self.tail_positions)
+        return (
+            len(self.data)
+            + self.block_last.itemsize * len(self.block_last)
+            + self.block_offsets.itemsize * len(self.block_offsets)
+            + self.block_sizes.itemsize * len(self.block_sizes)
+            + tail
+        )
+
+class TokenOffsets:
+    """
+    Offset karakter untuk setiap posisi token di satu dokumen.
+
+    Offset disimpan sebagai selisih (varint) dari offset posisi sebelumnya. Setiap
+    BLOCK_SIZE posisi ada checkpoint berisi offset absolut dan offset byte data,
+    sehingga offset sebuah posisi didapat dengan decode paling banyak
+    BLOCK_SIZE - 1 selisih.
+    """
+
+    def __init__(self):
+        self.data = bytearray()
+        self.checkpoint_offsets = array('I')
+        self.checkpoint_bytes = array('I')
+        self.count = 0
+        self.last = 0
+
+    def append(self, offset):
+        if self.count % BLOCK_SIZE == 0:
+            self.checkpoint_offsets.append(offset)
+            self.checkpoint_bytes.append(len(self.data))
+        else:
+            encode_varint(offset - self.last, self.data)
+        self.last = offset
+        self.count += 1
+
+    def add(self, position, offset):
+        """
+        Simpan offset untuk position (harus naik). Posisi yang terlewat (stopword,
+        tanda baca) diisi offset sebelumnya.
+        """
+        if position < self.count or offset < self.last:
+            raise ValueError("Posisi dan offset harus ditambahkan secara terurut naik")
+        while self.count < position:
+            self.append(self.last)
+        self.append(offset)
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, position):
+        if not 0 <= position < self.count:
+            raise IndexError(position)
+        block, rest = divmod(position, BLOCK_SIZE)
+        deltas, _ = decode_varints(self.data, self.checkpoint_bytes[block], rest)
+        return self.checkpoint_offsets[block] + sum(deltas)
+
+    def nbytes(self):
+        return (
+            len(self.data)
+            + self.checkpoint_offsets.itemsize * len(self.checkpoint_offsets)
+            + self.checkpoint_bytes.itemsize * len(self.checkpoint_bytes)
+        )
+
+class PostingsCursor:
+    """
+    Cursor maju-saja di atas CompressedPostings untuk intersection.
+    """
+
+    def __init__(self, postings):
+        self.postings = postings
+        self.block = 0
+        self.docs = None
+        self.index = 0
+
+    def seek(self, doc_id):
+        """
+        Maju ke doc_id pertama yang >= doc_id.
+        Returns: doc_id yang ditemukan, atau None jika postings habis
+        """
+        postings = self.postings
+        if self.docs is None or self.docs[-1] < doc_id:
+            block = postings.find_block(doc_id, self.block)
+            if block >= postings.num_blocks():
+                return None
+            if block != self.block or self.docs is None:
+                self.block = block
+                self.docs = postings.decode_docs(block)[0]
+                self.index = 0
+        self.index = bisect_left(self.docs, doc_id, self.index)
+        return self.docs[self.index]
+
+    def docs_between(self, low, high):
+        """
+        Semua doc_id dalam rentang [low, high], melompati blok sebelum low.
+        Cursor berhenti di blok yang memuat high agar rentang berikutnya bisa lanjut dari sana.
+        """
+        postings = self.postings
+        block = postings.find_block(low, self.block)
+        found = []
+        while block < postings.num_blocks():
+            docs = postings.decode_docs(block)[0]
+            found.extend(docs[bisect_left(docs, low):bisect_right(docs, high)])
+            if docs[-1] >= high:
+                break
+            block += 1
+        self.block = block
+        self.docs = None
+        return found
+
+# Jika postings lain lebih panjang dari ini kali postings terpendek, pakai seek per doc_id
+SEEK_RATIO = 8
+
+def intersect_postings(postings_lists):
+    """
+    Irisan beberapa CompressedPostings, dengan skip pointer untuk melompati blok.
+    Jika panjang postings timpang, setiap doc_id postings terpendek dicari di
+    postings lain (seek). Jika sebanding, irisan dihitung per blok postings
+    terpendek dengan set, karena hampir semua blok postings lain tetap harus dibaca.
+    Returns: list doc_id terurut
+    """
+    lists = sorted(postings_lists, key=len)
+    if not lists or not len(lists[0]):
+        return []
+    if len(lists[-1]) <= SEEK_RATIO * len(lists[0]):
+        return _intersect_blocks(lists)
+    cursors = [PostingsCursor(p) for p in lists[1:]]
+    result = []
+    for doc_id in lists[0]:
+        for cursor in cursors:
+            found = cursor.seek(doc_id)
+            if found is None:
+                return result
+            if found != doc_id:
+                break
+        else:
+            result.append(doc_id)
+    return result
+
+def _intersect_blocks(lists):
+    cursors = [PostingsCursor(p) for p in lists[1:]]
+    shortest = lists[0]
+    result = []
+    for block in range(shortest.num_blocks()):
+        candidates = shortest.decode_docs(block)[0]
+        for cursor in cursors:
+            other = set(cursor.docs_between(candidates[0], candidates[-1]))
+            candidates = [doc_id for doc_id in candidates if doc_id in other]
+            if not candidates:
+                break
+        result.extend(candidates)
+    return result
@@ -1,6 +1,7 @@
 import nltk
 import re
-from stemming_ays import stemming_ays
+from stemming_ays import stemming_ays, KAMUS
+from spelling import suggest_roots
 
 nltk.download('punkt', quiet=True)
 
@@ -16,6 +17,13 @@ def case_folding(text):
 def tokenizing(text):
     return nltk.word_tokenize(text)
 
+def sentence_tokenizing(text):
+    return nltk.sent_tokenize(text)
+
+def tokenizing_sentences(sentences):
+    # Sama dengan tokenizing pada teks yang pemecahan kalimatnya sudah diketahui
+    return [token for sentence in sentences for token in nltk.word_tokenize(sentence, preserve_line=True)]
+
 def filtering(tokens):
     return [t for t in tokens if t.isalpha() and t not in STOPWORDS]
 
@@ -32,6 +40,204 @@ def preprocess(text):
     result = [(word, stemming_ays(word)) for word in filtered]
     return result
 
+def preprocess_with_positions(text):
+    """
+    Sama seperti preprocess, tetapi menyimpan posisi token pada teks
+    (posisi dihitung sebelum filtering, sehingga stopword tetap memberi jarak)
+    Returns: List of tuples (original_word, stemmed_word, position)
+    """
+    tokens = tokenizing(case_folding(text))
+    return [
+        (word, stemming_ays(word), position)
+        for position, word in enumerate(tokens)
+        if word.isalpha() and word not in STOPWORDS
+    ]
+
+QUOTE_TOKENS = ('``', "''")
+
+def _case_folding_with_map(text):
+    """
+    Case folding yang juga mengembalikan pemetaan indeks karakter hasil ke teks asli
+    (None jika panjang teks tidak berubah, yang hampir selalu terjadi).
+    """
+    folded = case_folding(text)
+    if len(folded) == len(text):
+        return folded, None
+    char_map = []
+    for i, char in enumerate(text):
+        char_map.extend([i] * len(case_folding(char)))
+    return folded, char_map
+
+def _tokens_with_offsets(text, sentences=None):
+    """
+    Tokenisasi text sambil mencari offset karakter setiap token di text asli.
+    Token yang tidak ditemukan apa adanya di teks (diubah tokenizer) mendapat
+    offset akhir token sebelumnya.
+    sentences: kalimat text (sudah di-case folding) jika sudah dipecah sebelumnya
+    Yields: tuples (word, offset)
+    """
+    folded, char_map = _case_folding_with_map(text)
+    tokens = tokenizing(folded) if sentences is None else tokenizing_sentences(sentences)
+    cursor = 0
+    for word in tokens:
+        while cursor < len(folded) and folded[cursor].isspace():
+            cursor += 1
+        # Cari hanya di dekat cursor agar token yang diubah tokenizer tidak cocok jauh di depan
+        target = word
+        found = folded.find(target, cursor, cursor + len(target) + 4)
+        if found < 0 and word in QUOTE_TOKENS:
+            # Tokenizer NLTK menulis ulang tanda kutip " menjadi `` atau ''
+            target = '"'
+            found = folded.find(target, cursor, cursor + 4)
+        if found >= 0:
+            cursor = found + len(target)
+        else:
+            found = cursor
+        yield word, (char_map[found] if char_map and found < len(char_map) else found)
+
+def preprocess_with_offsets(text):
+    """
+    Sama seperti preprocess_with_positions, ditambah offset karakter awal kata di text
+    (untuk cuplikan teks yang dibaca dari TextStore)
+    Returns: List of tuples (original_word, stemmed_word, position, offset)
+    """
+    return [
+        (word, stemming_ays(word), position, offset)
+        for position, (word, offset) in enumerate(_tokens_with_offsets(text))
+        if word.isalpha() and word not in STOPWORDS
+    ]
+
+def _split_at_last_space(text):
+    # Potong text pada spasi terakhir: (bagian lengkap, sisa kata yang mungkin terpotong)
+    i = len(text) - 1
+    while i >= 0 and not text[i].isspace():
+        i -= 1
+    return text[:i + 1], text[i + 1:]
+
+def _split_at_last_sentence(text):
+    # Potong text sebelum dua kalimat terakhir: (bagian lengkap, kalimatnya, sisa).
+    # Batas kalimat terakhir diputuskan Punkt tanpa melihat teks sesudahnya (mis. "ed.)."
+    # di ujung text dipecah menjadi "ed." dan ")."), jadi yang dipakai adalah batas
+    # sebelumnya, dan kalimat bagian lengkap tidak dipecah ulang.
+    folded, char_map = _case_folding_with_map(text)
+    sentences = sentence_tokenizing(folded)
+    if len(sentences) < 3:
+        return '', [], text
+    start = folded.rfind(sentences[-2], 0, folded.rfind(sentences[-1]))
+    if char_map:
+        start = char_map[start]
+    return text[:start], sentences[:-2], text[start:]
+
+def preprocess_stream(chunks, max_carry=1 << 20):
+    """
+    Preprocessing bertahap untuk teks besar yang dibaca per potongan (mis. utils.stream_txt).
+    Dua kalimat terakhir setiap chunk (yang terakhir mungkin terpotong) disambung
+    dengan chunk berikutnya, sehingga pemecahan kalimat dan token sama seperti pada
+    teks utuh dan posisi token sama dengan preprocess_with_offsets. Kalimat yang
+    lebih panjang dari max_carry dipotong di spasi terakhir; posisi token di sekitar
+    potongan tersebut bisa bergeser.
+    Yields: tuples (original_word, stemmed_word, position, offset)
+    """
+    position = 0
+    base = 0  # offset karakter awal text di seluruh aliran
+    carry = ''
+    for chunk in chunks:
+        text, sentences, carry = _split_at_last_sentence(carry + chunk)
+        if not text:
+            if len(carry) < max_carry:
+                continue
+            # Kalimat sangat panjang: potong di spasi terakhir agar memori tetap terbatas
+            text, carry = _split_at_last_space(carry)
+            if not text:
+                text, carry = carry, ''
+            sentences = None
+        for word, offset in _tokens_with_offsets(text, sentences):
+            if word.isalpha() and word not in STOPWORDS:
+                yield (word, stemming_ays(word), position, base + offset)
+            position += 1
+        base += len(text)
+    if carry:
+        for word, offset in _tokens_with_offsets(carry):
+            if word.isalpha() and word not in STOPWORDS:
+                yield (word, stemming_ays(word), position, base + offset)
+            position += 1
+
+PHRASE_PATTERN = re.compile(r'"([^"]+)"')
+NEAR_PATTERN = re.compile(r'(\S+)\s+NEAR/(\d+)\s+(\S+)')
+NEAR_OPERATOR = re.compile(r'\bNEAR/\d+\b')
+
+def expand_query_stems(tokens, max_distance=2, min_length=4, vocabulary=None):
+    """
+    Tambahkan stem dari kata dasar terdekat di kamus untuk kata query yang stem-nya
+    tidak dikenal (kemungkinan salah ketik). Stem yang ada di kamus atau di
+    vocabulary (mis. index.postings) dianggap dikenal, sehingga kata benar yang
+    stem-nya tidak ada di kamus (mis. "digital" -> "gital") tidak ikut dikoreksi. Yang dicari lebih dulu adalah kata
+    aslinya, karena stemming kata yang salah ketik bisa memotong imbuhan secara
+    keliru; stem baru dipakai jika kata asli tidak punya saran (kata berimbuhan
+    seperti "pembelajran" terlalu jauh dari kata dasarnya). Saran di-stem ulang
+    agar sama dengan stem yang tersimpan di index.
+    Stem asli tetap dipertahankan.
+    tokens: list of tuples (original_word, stemmed_word) hasil preprocess
+    Returns: (list stem hasil ekspansi, dict {kata: list stem koreksi})
+    """
+    expanded = [stem for _, stem in tokens]
+    corrections = {}
+    for word, stem in tokens:
+        if stem in KAMUS or word in corrections or len(word) < min_length:
+            continue
+        if vocabulary is not None and stem in vocabulary:
+            continue
+        roots = suggest_roots(word, max_distance)
+        if not roots and stem != word and len(stem) >= min_length:
+            roots = suggest_roots(stem, max_distance)
+        suggested = []
+        for root in roots:
+            root_stem = stemming_ays(root)
+            if root_stem not in suggested:
+                suggested.append(root_stem)
+        if suggested:
+            corrections[word] = suggested
+            expanded.extend(root_stem for root_stem in suggested if root_stem not in expanded)
+    return expanded, corrections
+
+def parse_query(text, fuzzy=False, max_distance=2, vocabulary=None):
+    """
+    Pisahkan query menjadi kata biasa, frasa ("...") dan klausa NEAR/k.
+    fuzzy: jika True, stem yang tidak ada di kamus diperluas ke kata dasar terdekat
+    vocabulary: stem yang ada di index (mis. index.postings); stem tersebut tidak diperluas
+    Returns: dict dengan
+        'terms'       : list stem seluruh query
+        'phrases'     : list frasa, tiap frasa list of (stem, offset posisi)
+        'near'        : list of (stem_a, stem_b, k)
+        'corrections' : dict {kata: list stem pengganti} (hanya jika fuzzy)
+    """
+    phrases = []
+    for phrase_text in PHRASE_PATTERN.findall(text):
+        tokens = preprocess_with_positions(phrase_text)
+        if len(tokens) > 1:
+            start = tokens[0][2]
+            phrases.append([(stem, position - start) for _, stem, position in tokens])
+
+    near = []
+    for left, distance, right in NEAR_PATTERN.findall(PHRASE_PATTERN.sub(" ", text)):
+        left_tokens = preprocess(left)
+        right_tokens = preprocess(right)
+        if left_tokens and right_tokens:
+            near.append((left_tokens[-1][1], right_tokens[0][1], int(distance)))
+
+    tokens = preprocess(NEAR_OPERATOR.sub(" ", text))
+    terms = [stem for _, stem in tokens]
+    corrections = {}
+    if fuzzy:
+        terms, corrections = expand_query_stems(tokens, max_distance, vocabulary=vocabulary)
+
+    return {
+        'terms': terms,
+        'phrases': phrases,
+        'near': near,
+        'corrections': corrections
+    }
+
 def preprocess_detailed(text):
     """
     Preprocessing lengkap dengan detail tahapan
@@ -0,0 +1,61 @@
+from collections import OrderedDict
+
+class QueryCache:
+    """
+    Cache hasil DocumentIndex.search dengan eviksi LRU.
+
+    Kunci cache berisi stem query yang dinormalisasi (unik dan terurut, karena
+    skor tidak bergantung pada urutan atau pengulangan stem), mode ranking,
+    batasan frasa/NEAR, dan generation index. Setiap kali index berubah
+    (generation naik), seluruh isi cache dibuang.
+    """
+
+    def __init__(self, index, maxsize=256):
+        self.index = index
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.generation = index.generation
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def clear(self):
+        self.entries.clear()
+
+    @staticmethod
+    def make_key(query_stems, mode, phrases=(), near=()):
+        return (
+            mode,
+            tuple(sorted(set(query_stems))),
+            tuple(sorted(tuple(phrase) for phrase in phrases)),
+            tuple(sorted(tuple(clause) for clause in near)),
+        )
+
+    def search(self, query_stems, k=10, mode="jaccard", phrases=(), near=()):
+        """
+        Sama seperti DocumentIndex.search, tetapi hasil diambil dari cache jika ada.
+        Hasil dengan k lebih besar (atau yang sudah lengkap) dipakai ulang untuk k lebih kecil.
+        Returns: list of tuples (nama_dokumen, skor)
+        """
+        if self.index.generation != self.generation:
+            self.clear()
+            self.generation = self.index.generation
+
+        key = self.make_key(query_stems, mode, phrases, near)
+        cached = self.entries.get(key)
+        if cached is not None:
+            cached_k, results = cached
+            if cached_k >= k or len(results) < cached_k:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return results[:k]
+
+        self.misses += 1
+        results = self.index.search(query_stems, k=k, mode=mode, phrases=phrases, near=near)
+        self.entries[key] = (k, results)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+        return results[:]
@@ -0,0 +1,267 @@
+import heapq
+import os
+import zlib
+from collections import Counter
+from itertools import chain
+from multiprocessing import Pipe, Process
+from multiprocessing.connection import Client, Listener
+
+from indexing import DocumentIndex
+
+def shard_of(name, n_shards):
+    """
+    Nomor shard untuk sebuah dokumen, dari crc32 nama dokumen
+    (stabil antar proses, tidak seperti hash() bawaan Python).
+    """
+    return zlib.crc32(name.encode('utf-8')) % n_shards
+
+def serve_index(conn, options):
+    """
+    Loop worker shard: terima (nama_method, args, kwargs), jalankan pada
+    DocumentIndex milik shard, lalu kirim ('ok', hasil) atau ('error', exception).
+    Berhenti saat menerima None atau koneksi ditutup.
+    """
+    index = DocumentIndex(**options)
+    while True:
+        try:
+            message = conn.recv()
+        except EOFError:
+            break
+        if message is None:
+            break
+        method, args, kwargs = message
+        try:
+            if method.startswith('_'):
+                raise AttributeError(f"Method '{method}' tidak dapat dipanggil dari koordinator")
+            conn.send(('ok', getattr(index, method)(*args, **kwargs)))
+        except Exception as e:
+            conn.send(('error', e))
+    conn.close()
+
+def run_shard_server(address, authkey, options, ready=None):
+    """
+    Server shard lewat socket, pengganti node remote. Melayani satu koordinator.
+    ready: Connection opsional untuk mengirim alamat yang dipakai (port 0 = dipilih OS)
+    """
+    with Listener(address, authkey=authkey) as listener:
+        if ready is not None:
+            ready.send(listener.address)
+            ready.close()
+        with listener.accept() as conn:
+            serve_index(conn, options)
+
+class ShardedIndex:
+    """
+    DocumentIndex yang dipecah menjadi beberapa shard berdasarkan crc32 nama dokumen.
+    Setiap shard dilayani proses worker sendiri, lewat Pipe (transport='pipe') atau
+    socket lokal (transport='socket'); addresses dipakai untuk terhubung ke server
+    shard yang sudah berjalan (run_shard_server).
+
+    Query dikirim ke semua shard sekaligus (scatter) lalu top-k tiap shard digabung
+    (gather). Untuk BM25, statistik koleksi (jumlah dokumen, rata-rata panjang, df)
+    dijumlahkan dari semua shard dan dikirim bersama query, sehingga skor sama
+    dengan DocumentIndex tunggal. Jaccard, frasa dan NEAR/k hanya butuh data per
+    dokumen sehingga dihitung di shard masing-masing.
+
+    df seluruh kosakata diambil sekali setiap index berubah, sehingga query BM25
+    tidak butuh round trip tambahan.
+    """
+
+    def __init__(self, n_shards=2, transport="pipe", addresses=None, authkey=None, **options):
+        self.options = options
+        self.processes = []
+        self.connections = []
+        if addresses:
+            for address in addresses:
+                self.connections.append(Client(address, authkey=authkey))
+        else:
+            authkey = authkey or os.urandom(16)
+            for _ in range(n_shards):
+                self._start_worker(transport, authkey)
+        self.n_shards = len(self.connections)
+
+        self.doc_names = []
+        self.doc_order = {}
+        self.total_length = 0
+        self.generation = 0
+        self._doc_freqs = None
+
+    def _start_worker(self, transport, authkey):
+        if transport == "pipe":
+            conn, child_conn = Pipe()
+            process = Process(target=serve_index, args=(child_conn, self.options), daemon=True)
+            process.start()
+            child_conn.close()
+        elif transport == "socket":
+            ready_recv, ready_send = Pipe(duplex=False)
+            process = Process(
+                target=run_shard_server,
+                args=(('localhost', 0), authkey, self.options, ready_send),
+                daemon=True
+            )
+            process.start()
+            ready_send.close()
+            conn = Client(ready_recv.recv(), authkey=authkey)
+            ready_recv.close()
+        else:
+            raise ValueError(f"Transport tidak dikenal: {transport}")
+        self.processes.append(process)
+        self.connections.append(conn)
+
+    def __len__(self):
+        return len(self.doc_names)
+
+    def __contains__(self, name):
+        return name in self.doc_order
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _scatter(self, calls):
+        """
+        Kirim semua panggilan dulu agar shard bekerja paralel, baru kumpulkan hasilnya.
+        calls: list of (shard, method, args, kwargs)
+        Returns: list hasil sesuai urutan calls
+        """
+        for shard, method, args, kwargs in calls:
+            self.connections[shard].send((method, args, kwargs))
+        replies = [self.connections[shard].recv() for shard, _, _, _ in calls]
+        for status, value in replies:
+            if status == 'error':
+                raise value
+        return [value for _, value in replies]
+
+    def _call(self, shard, method, *args, **kwargs):
+        return self._scatter([(shard, method, args, kwargs)])[0]
+
+    def _broadcast(self, method, *args, **kwargs):
+        return self._scatter([(shard, method, args, kwargs) for shard in range(self.n_shards)])
+
+    def _changed(self):
+        self.generation += 1
+        self._doc_freqs = None
+
+    def shard_of(self, name):
+        return shard_of(name, self.n_shards)
+
+    def add_documents(self, documents):
+        """
+        Tambahkan dokumen dari dict {nama_dokumen: tokens}; setiap shard menerima
+        dokumennya dalam satu pesan. Jika ada shard yang gagal, dokumen yang sudah
+        tersimpan di shard lain tetap dicatat sebelum error diteruskan.
+        """
+        batches = [{} for _ in range(self.n_shards)]
+        for name, tokens in documents.items():
+            if name in self.doc_order:
+                raise ValueError(f"Dokumen '{name}' sudah ada di index")
+            batches[self.shard_of(name)][name] = list(tokens)
+        calls = [(shard, 'add_documents', (batch,), {}) for shard, batch in enumerate(batches) if batch]
+        try:
+            self._scatter(calls)
+        except Exception:
+            lengths = {}
+            for shard_lengths in self._scatter([
+                (shard, 'document_lengths', (list(batches[shard]),), {}) for shard, _, _, _ in calls
+            ]):
+                lengths.update(shard_lengths)
+            self._record(documents, lengths)
+            raise
+        self._record(documents, {name: len(batch[name]) for batch in batches for name in batch})
+
+    def _record(self, names, lengths):
+        # Catat dokumen yang tersimpan di shard, dengan urutan sama seperti input
+        for name in names:
+            if name in lengths:
+                self.doc_order[name] = len(self.doc_names)
+                self.doc_names.append(name)
+                self.total_length += lengths[name]
+        self._changed()
+
+    def add_document(self, name, tokens):
+        self.add_documents({name: tokens})
+        return self.doc_order[name]
+
+    def flush(self):
+        self._broadcast('flush')
+
+    def avg_doc_length(self):
+        return self.total_length / len(self.doc_names) if self.doc_names else 0.0
+
+    def collection_stats(self, stems=()):
+        """
+        Statistik koleksi global: (jumlah dokumen, rata-rata panjang, {stem: df}).
+        df seluruh kosakata dijumlahkan dari semua shard sekali, lalu disimpan
+        sampai index berubah.
+        """
+        if self._doc_freqs is None:
+            self._doc_freqs = Counter()
+            for doc_freqs in self._broadcast('doc_freqs'):
+                self._doc_freqs.update(doc_freqs)
+        return (len(self.doc_names), self.avg_doc_length(), {stem: self._doc_freqs[stem] for stem in stems})
+
+    def doc_freq(self, stem):
+        return self.collection_stats([stem])[2][stem]
+
+    def _merge(self, results, k):
+        # Urutan sama dengan DocumentIndex: skor tertinggi, lalu dokumen yang lebih dulu ditambahkan
+        # (nama yang tidak tercatat, mis. dari add_documents yang gagal, diurutkan paling akhir)
+        unknown = len(self.doc_order)
+        return heapq.nlargest(
+            k, chain.from_iterable(results), key=lambda item: (item[1], -self.doc_order.get(item[0], unknown))
+        )
+
+    def search(self, query_stems, k=10, mode="jaccard", phrases=(), near=()):
+        """
+        Sama seperti DocumentIndex.search, dijalankan paralel di semua shard.
+        Returns: list of tuples (nama_dokumen, skor), terurut dari skor tertinggi
+        """
+        query_stems = list(query_stems)
+        stats = self.collection_stats(query_stems) if mode == "bm25" else None
+        results = self._broadcast(
+            'search', query_stems, k=k, mode=mode, phrases=phrases, near=near, stats=stats
+        )
+        return self._merge(results, k)
+
+    def more_like_this(self, name, k=10, mode="jaccard", max_terms=None):
+        """
+        Sama seperti DocumentIndex.more_like_this: stem dokumen sumber diambil dari
+        shard pemiliknya, lalu dicari di semua shard.
+        """
+        if name not in self.doc_order:
+            raise KeyError(name)
+        owner = self.shard_of(name)
+        source_set = self._call(owner, 'document_stems', name)
+        if max_terms:
+            stats = self.collection_stats(source_set)
+            query_set = set(self._call(owner, 'discriminative_stems', name, max_terms, stats=stats))
+        else:
+            query_set = source_set
+        stats = self.collection_stats(query_set) if mode == "bm25" else None
+        results = self._broadcast(
+            'search_similar', source_set, query_set, k=k, mode=mode, exclude=name, stats=stats
+        )
+        return self._merge(results, k)
+
+    def close(self):
+        for conn in self.connections:
+            try:
+                conn.send(None)
+            except (OSError, EOFError):
+                pass
+            conn.close()
+        for process in self.processes:
+            process.join(timeout=5)
+        self.connections = []
+        self.processes = []
+
+def build_sharded_index(documents, n_shards=2, transport="pipe", **options):
+    """
+    Bangun ShardedIndex dari dict {nama_dokumen: list token hasil preprocess}.
+    options diteruskan ke DocumentIndex setiap shard (positions, compress, offsets).
+    """
+    index = ShardedIndex(n_shards=n_shards, transport=transport, **options)
+    index.add_documents(documents)
+    return index
@@ -1,3 +1,5 @@
+import math
+
 def jaccard_similarity(tokens1, tokens2):
     """
     Calculate Jaccard similarity between two lists of tokens.
@@ -21,3 +23,19 @@ def jaccard_similarity(tokens1, tokens2):
         return 0.0
 
     return len(intersection) / len(union)
+
+def bm25_idf(df, n_docs):
+    """
+    IDF versi BM25 (selalu positif).
+    df: jumlah dokumen yang mengandung kata, n_docs: jumlah seluruh dokumen
+    """
+    return math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+
+def bm25_term_score(tf, idf, doc_len, avg_doc_len, k1=1.5, b=0.75):
+    """
+    Kontribusi satu kata query terhadap skor BM25 sebuah dokumen.
+    """
+    if tf == 0:
+        return 0.0
+    norm = k1 * (1 - b + b * doc_len / avg_doc_len) if avg_doc_len else k1
+    return idf * tf * (k1 + 1) / (tf + norm)
@@ -0,0 +1,86 @@
+import re
+from collections import defaultdict
+
+from preprocessing import case_folding, STOPWORDS
+from stemming_ays import stemming_ays
+
+WORD_PATTERN = re.compile(r'(\w+)')
+
+def best_window(positions, width):
+    """
+    Cari jendela width posisi token yang memuat stem query terbanyak
+    (stem berbeda dulu, lalu jumlah kemunculan; jendela paling awal jika seri).
+    positions: dict {stem: list posisi terurut}
+    Returns: (posisi_awal, posisi_akhir) kemunculan dalam jendela, atau None
+    """
+    events = sorted((position, stem) for stem, stem_positions in positions.items() for position in stem_positions)
+    if not events:
+        return None
+    counts = defaultdict(int)
+    best = None
+    best_key = None
+    left = 0
+    for right, (position, stem) in enumerate(events):
+        counts[stem] += 1
+        while events[left][0] <= position - width:
+            left_stem = events[left][1]
+            counts[left_stem] -= 1
+            if not counts[left_stem]:
+                del counts[left_stem]
+            left += 1
+        key = (len(counts), right - left + 1)
+        if best_key is None or key > best_key:
+            best_key = key
+            best = (events[left][0], position)
+    return best
+
+def make_snippet(index, store, name, query_stems, width=30, max_chars=400):
+    """
+    Cuplikan teks di sekitar jendela terbaik kata query. Hanya potongan teks
+    tersebut yang dibaca dari TextStore (lewat offset karakter di index).
+    Returns: string cuplikan (dengan '...' jika terpotong)
+    """
+    doc_id = index.doc_ids[name]
+    positions = {}
+    for stem in set(query_stems):
+        if doc_id in index.postings.get(stem, ()):
+            positions[stem] = index.get_positions(stem, doc_id)
+    window = best_window(positions, width)
+
+    length = store.length(name)
+    if window is None:
+        start = 0
+        end = max_chars
+    else:
+        first = index.token_offset(name, window[0])
+        last = index.token_offset(name, window[1])
+        context = max(0, (max_chars - (last - first)) // 2)
+        start = max(0, first - context)
+        end = max(start + max_chars, last + 40)
+
+    text = store.read(name, start, end)
+    words = text.split()
+    # Buang kata yang terpotong di tepi cuplikan
+    if words and start > 0 and not text[0].isspace():
+        words = words[1:]
+    if words and end < length and not text[-1].isspace():
+        words = words[:-1]
+    return ('... ' if start > 0 else '') + ' '.join(words) + (' ...' if end < length else '')
+
+def highlight_terms(text, query_stems, before='**', after='**', escape=None):
+    """
+    Tandai kata di text yang stem-nya termasuk stem query.
+    escape: fungsi opsional untuk bagian teks yang tidak ditandai (mis. escape markdown)
+    """
+    query_set = set(query_stems)
+    parts = WORD_PATTERN.split(text)
+    for i in range(1, len(parts), 2):
+        word = case_folding(parts[i])
+        if word.isalpha() and word not in STOPWORDS and stemming_ays(word) in query_set:
+            parts[i] = before + parts[i] + after
+        elif escape:
+            parts[i] = escape(parts[i])
+    if escape:
+        for i in range(0, len(parts), 2):
+            parts[i] = escape(parts[i])
+    return ''.join(parts)
@@ -0,0 +1,211 @@
+import os
+import pickle
+from functools import lru_cache
+
+from stemming_ays import KAMUS
+
+KAMUS_PATH = 'kamus.txt'
+SYMSPELL_PATH = 'kamus_symspell.pkl'
+
+def edit_distance(word1, word2, max_distance):
+    """
+    Jarak Damerau-Levenshtein (optimal string alignment) antara dua kata.
+    Returns: jarak, atau max_distance + 1 jika melebihi batas
+    """
+    if abs(len(word1) - len(word2)) > max_distance:
+        return max_distance + 1
+
+    # Buang awalan dan akhiran yang sama, DP hanya untuk bagian yang berbeda
+    start = 0
+    end1, end2 = len(word1), len(word2)
+    while start < end1 and start < end2 and word1[start] == word2[start]:
+        start += 1
+    while end1 > start and end2 > start and word1[end1 - 1] == word2[end2 - 1]:
+        end1 -= 1
+        end2 -= 1
+    if start == end1 or start == end2:
+        return min(max(end1, end2) - start, max_distance + 1)
+    word1 = word1[start:end1]
+    word2 = word2[start:end2]
+
+    len2 = len(word2)
+    previous2 = None
+    previous = list(range(len2 + 1))
+    for i in range(1, len(word1) + 1):
+        char1 = word1[i - 1]
+        current = [i] * (len2 + 1)
+        row_min = i
+        for j in range(1, len2 + 1):
+            if char1 == word2[j - 1]:
+                value = previous[j - 1]
+            else:
+                value = previous[j - 1] + 1
+                if previous[j] < value:
+                    value = previous[j] + 1
+                if current[j - 1] < value:
+                    value = current[j - 1] + 1
+                if (i > 1 and j > 1 and char1 == word2[j - 2]
+                        and word1[i - 2] == word2[j - 1] and previous2[j - 2] < value):
+                    value = previous2[j - 2] + 1
+            current[j] = value
+            if value < row_min:
+                row_min = value
+        if row_min > max_distance:
+            return max_distance + 1
+        previous2, previous = previous, current
+    return min(previous[-1], max_distance + 1)
+
+def delete_variants(word, max_distance):
+    """
+    Semua string yang didapat dengan menghapus 1..max_distance huruf dari word.
+    """
+    variants = set()
+    queue = [word]
+    for _ in range(max_distance):
+        next_queue = []
+        for current in queue:
+            for i in range(len(current)):
+                variant = current[:i] + current[i + 1:]
+                if variant not in variants:
+                    variants.add(variant)
+                    next_queue.append(variant)
+        queue = next_queue
+    return variants
+
+class SymSpellIndex:
+    """
+    Index symmetric-delete (SymSpell) untuk mencari kata dasar terdekat.
+
+    Setiap kata kamus didaftarkan di bawah semua variasi hapus-huruf dari prefix
+    kata tersebut. Saat lookup cukup membuat variasi hapus-huruf dari kata query
+    lalu memverifikasi kandidatnya, tanpa memindai seluruh kamus.
+    """
+
+    def __init__(self, max_distance=2, prefix_length=7):
+        self.max_distance = max_distance
+        self.prefix_length = prefix_length
+        self.deletes = {}
+        self.words = set()
+
+    def add_word(self, word):
+        if word in self.words:
+            return
+        self.words.add(word)
+        prefix = word[:self.prefix_length]
+        for key in delete_variants(prefix, self.max_distance) | {prefix}:
+            entry = self.deletes.get(key)
+            if entry is None:
+                self.deletes[key] = word
+            elif isinstance(entry, str):
+                self.deletes[key] = [entry, word]
+            else:
+                entry.append(word)
+
+    def lookup(self, word, max_distance=None, closest=False):
+        """
+        Cari kata kamus dengan jarak edit <= max_distance.
+        closest: hanya kembalikan kandidat dengan jarak terkecil (lebih cepat,
+                 batas jarak menyempit begitu kandidat ditemukan)
+        Returns: list of tuples (kata, jarak), terurut dari jarak terkecil
+        """
+        if max_distance is None or max_distance > self.max_distance:
+            max_distance = self.max_distance
+        if closest and word in self.words:
+            return [(word, 0)]
+
+        prefix = word[:self.prefix_length]
+        seen = set()
+        suggestions = []
+        level = [prefix]
+        visited = {prefix}
+        for deleted in range(max_distance + 1):
+            # Kandidat dari kunci dengan `deleted` huruf terhapus berjarak >= deleted
+            if closest and suggestions and deleted > max_distance:
+                break
+            next_level = []
+            for key in level:
+                if deleted < max_distance:
+                    for i in range(len(key)):
+                        variant = key[:i] + key[i + 1:]
+                        if variant not in visited:
+                            visited.add(variant)
+                            next_level.append(variant)
+                entry = self.deletes.get(key)
+                if entry is None:
+                    continue
+                for candidate in ([entry] if isinstance(entry, str) else entry):
+                    if candidate in seen:
+                        continue
+                    seen.add(candidate)
+                    distance = edit_distance(word, candidate, max_distance)
+                    if distance <= max_distance:
+                        suggestions.append((candidate, distance))
+                        if closest and distance < max_distance:
+                            max_distance = distance
+            level = next_level
+
+        if closest:
+            suggestions = [item for item in suggestions if item[1] == max_distance]
+        return sorted(suggestions, key=lambda item: (item[1], item[0]))
+
+    def save(self, path, signature=None):
+        with open(path, 'wb') as f:
+            pickle.dump((signature, self), f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @staticmethod
+    def load(path, signature=None):
+        """
+        Muat index dari file; None jika file tidak ada atau signature berbeda.
+        """
+        try:
+            with open(path, 'rb') as f:
+                saved_signature, index = pickle.load(f)
+        except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+            return None
+        if saved_signature != signature:
+            return None
+        return index
+
+def kamus_signature(max_distance, prefix_length):
+    try:
+        stat = os.stat(KAMUS_PATH)
+        kamus_info = (stat.st_size, stat.st_mtime_ns)
+    except FileNotFoundError:
+        kamus_info = None
+    return (kamus_info, len(KAMUS), max_distance, prefix_length)
+
+_symspell = None
+
+def get_symspell(max_distance=2, prefix_length=7, path=SYMSPELL_PATH):
+    """
+    Index SymSpell untuk kamus kata dasar. Dibangun sekali, disimpan ke path,
+    dan dimuat ulang dari file selama kamus.txt tidak berubah.
+    """
+    global _symspell
+    signature = kamus_signature(max_distance, prefix_length)
+    if _symspell is not None and _symspell[0] == signature:
+        return _symspell[1]
+
+    index = SymSpellIndex.load(path, signature)
+    if index is None:
+        index = SymSpellIndex(max_distance, prefix_length)
+        for word in KAMUS:
+            index.add_word(word)
+        try:
+            index.save(path, signature)
+        except OSError as e:
+            print(f"Warning: index SymSpell tidak dapat disimpan ke {path}: {e}")
+    _symspell = (signature, index)
+    return index
+
+@lru_cache(maxsize=4096)
+def _closest_roots(word, max_distance):
+    return tuple(root for root, _ in get_symspell().lookup(word, max_distance, closest=True))
+
+def suggest_roots(word, max_distance=2, limit=3):
+    """
+    Saran kata dasar dari kamus untuk kata yang tidak dikenal.
+    Hanya kandidat dengan jarak edit terkecil yang dikembalikan.
+    Returns: list kata dasar (maksimal limit)
+    """
+    return list(_closest_roots(word, max_distance)[:limit])
@@ -1,3 +1,6 @@
+import os
+import pickle
+
 # Load kamus kata dasar
 def load_kamus():
     try:
@@ -10,48 +13,126 @@ def load_kamus():
 # Inisialisasi kamus
 KAMUS = load_kamus()
 
-def stemming_ays(word):
+PREFIXES = [
+    'meng', 'meny', 'men', 'mem', 'me',
+    'peng', 'pen', 'pem', 'pe',
+    'ber', 'per', 'di', 'ke', 'se', 'ter'
+]
+
+SUFFIXES = ['kan', 'an', 'i', 'lah', 'kah', 'nya']
+
+INFLECTIONS_PATH = 'kamus_inflections.pkl'
+
+def inflection_signature():
+    """
+    Penanda versi kamus dan daftar imbuhan; tabel infleksi yang dibuat dari
+    kamus/imbuhan berbeda tidak akan dipakai.
+    """
+    try:
+        stat = os.stat('kamus.txt')
+        kamus_info = (stat.st_size, stat.st_mtime_ns)
+    except FileNotFoundError:
+        kamus_info = None
+    return (kamus_info, len(KAMUS), tuple(PREFIXES), tuple(SUFFIXES))
+
+def load_inflections(path=INFLECTIONS_PATH):
+    """
+    Muat tabel infleksi {bentuk_kata: kata_dasar} hasil inflection.py.
+    Returns: dict, kosong jika file belum dibuat atau sudah kedaluwarsa
+    """
+    try:
+        with open(path, 'rb') as f:
+            signature, table = pickle.load(f)
+    except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+        return {}
+    if signature != inflection_signature():
+        print("Warning: tabel infleksi kedaluwarsa, jalankan ulang inflection.py.")
+        return {}
+    return table
+
+# Tabel infleksi baru dimuat saat stemming_ays pertama kali dipanggil tanpa tracer,
+# agar proses yang hanya mengimpor modul ini (mis. worker shard) tidak ikut memuatnya
+INFLECTIONS = None
+
+def get_inflections():
+    """
+    Returns: tabel infleksi, dimuat dari INFLECTIONS_PATH pada pemanggilan pertama
+    """
+    global INFLECTIONS
+    if INFLECTIONS is None:
+        INFLECTIONS = load_inflections()
+    return INFLECTIONS
+
+def stemming_ays(word, tracer=None):
     """
     Algoritma stemming AYS dengan validasi kamus kata dasar
-    untuk mengurangi over-stemming dan under-stemming
+    untuk mengurangi over-stemming dan under-stemming.
+    Bentuk kata yang ada di tabel infleksi langsung dijawab dari tabel,
+    sisanya diproses dengan aturan.
+    tracer: objek pencatat proses (mis. StemmingTrace); jika None tidak ada
+            string atau dict yang dibuat untuk pencatatan
     """
-    original_word = word
     word = word.lower()
     
     # Jika sudah kata dasar, langsung return
     if word in KAMUS:
+        if tracer is not None:
+            tracer.in_kamus(word)
         return word
     
-    prefixes = [
-        'meng', 'meny', 'men', 'mem', 'me',
-        'peng', 'pen', 'pem', 'pe',
-        'ber', 'per', 'di', 'ke', 'se', 'ter'
-    ]
-    
-    suffixes = ['kan', 'an', 'i', 'lah', 'kah', 'nya']
+    if tracer is None:
+        root = (INFLECTIONS if INFLECTIONS is not None else get_inflections()).get(word)
+        if root is not None:
+            return root
+    else:
+        # Tabel infleksi dilewati agar setiap langkah aturan tercatat
+        tracer.not_in_kamus(word)
+    return _strip_affixes(word, tracer)
+
+def stemming_ays_rules(word):
+    """
+    Aturan stemming AYS tanpa tabel infleksi
+    """
+    word = word.lower()
+    if word in KAMUS:
+        return word
+    return _strip_affixes(word)
+
+def _strip_affixes(word, tracer=None):
+    # word sudah lowercase dan tidak ada di kamus
+    prefixes = PREFIXES
+    suffixes = SUFFIXES
     
     # Coba hilangkan suffix dulu
     temp_word = word
-    removed_suffix = None
     for s in suffixes:
         if temp_word.endswith(s):
             temp_word = temp_word[:-len(s)]
-            removed_suffix = s
+            if tracer is not None:
+                tracer.remove_suffix(s, word, temp_word)
             break
     
     # Cek apakah hasil setelah hilangkan suffix ada di kamus
     if temp_word in KAMUS:
+        if tracer is not None:
+            tracer.found(temp_word)
         return temp_word
     
     # Coba hilangkan prefix dari hasil setelah suffix dihilangkan
     for p in prefixes:
         if temp_word.startswith(p):
             result = temp_word[len(p):]
+            if tracer is not None:
+                tracer.remove_prefix(p, temp_word, result)
             # Validasi: hasil harus ada di kamus atau minimal 3 karakter
             if result in KAMUS:
+                if tracer is not None:
+                    tracer.found(result)
                 return result
             # Jika tidak di kamus tapi hasil > 2 karakter, coba tetap gunakan
             if len(result) > 2:
+                if tracer is not None:
+                    tracer.accepted(result)
                 return result
     
     # Jika tidak berhasil dengan urutan suffix->prefix, coba prefix->suffix
@@ -59,185 +140,116 @@ def stemming_ays(word):
     for p in prefixes:
         if temp_word.startswith(p):
             temp_word = temp_word[len(p):]
+            if tracer is not None:
+                tracer.retry_prefix(p, word, temp_word)
             break
     
     # Cek hasil setelah hilangkan prefix
     if temp_word in KAMUS:
+        if tracer is not None:
+            tracer.found(temp_word, suffix_removed=False)
         return temp_word
     
     # Hilangkan suffix dari hasil prefix
     for s in suffixes:
         if temp_word.endswith(s):
             result = temp_word[:-len(s)]
+            if tracer is not None:
+                tracer.retry_suffix(s, temp_word, result)
             if result in KAMUS:
+                if tracer is not None:
+                    tracer.found(result)
                 return result
             if len(result) > 2:
+                if tracer is not None:
+                    tracer.accepted(result)
                 return result
     
     # Jika semua gagal, return hasil terakhir yang valid atau kata asli
     # Hindari over-stemming dengan memastikan hasil minimal 3 karakter
     if len(temp_word) >= 3:
+        if tracer is not None:
+            tracer.fallback(temp_word)
         return temp_word
     else:
+        if tracer is not None:
+            tracer.unstemmed(word)
         return word
 
+class StemmingTrace:
+    """
+    Tracer untuk stemming_ays: mencatat langkah-langkah proses stemming
+    beserta prefix/suffix yang dihapus, untuk ditampilkan di UI.
+    """
+
+    def __init__(self, original):
+        self.original = original
+        self.steps = []
+        self.prefix_removed = None
+        self.suffix_removed = None
+        self.in_dictionary = False
+
+    def in_kamus(self, word):
+        self.steps.append(f"✓ Kata '{word}' ditemukan di kamus (sudah kata dasar)")
+        self.in_dictionary = True
+
+    def not_in_kamus(self, word):
+        self.steps.append(f"• Kata '{word}' tidak ada di kamus, mulai proses stemming")
+
+    def remove_suffix(self, suffix, before, after):
+        self.suffix_removed = suffix
+        self.steps.append(f"• Menghapus suffix '-{suffix}': '{before}' → '{after}'")
+
+    def remove_prefix(self, prefix, before, after):
+        self.prefix_removed = prefix
+        self.steps.append(f"• Menghapus prefix '{prefix}-': '{before}' → '{after}'")
+
+    def retry_prefix(self, prefix, before, after):
+        # Urutan terbalik: hanya dicatat jika belum ada prefix yang dihapus
+        if self.prefix_removed is None:
+            self.prefix_removed = prefix
+            self.steps.append(f"• Mencoba hapus prefix '{prefix}-': '{before}' → '{after}'")
+
+    def retry_suffix(self, suffix, before, after):
+        if self.suffix_removed is None:
+            self.suffix_removed = suffix
+            self.steps.append(f"• Menghapus suffix '-{suffix}': '{before}' → '{after}'")
+
+    def found(self, result, suffix_removed=True):
+        self.steps.append(f"✓ Hasil '{result}' ditemukan di kamus")
+        self.in_dictionary = True
+        if not suffix_removed:
+            self.suffix_removed = None
+
+    def accepted(self, result):
+        self.steps.append(f"• Hasil '{result}' tidak di kamus tapi valid (>2 karakter)")
+
+    def fallback(self, result):
+        self.steps.append(f"• Menggunakan hasil '{result}' (>= 3 karakter)")
+
+    def unstemmed(self, word):
+        self.steps.append(f"⚠ Tidak dapat di-stem, menggunakan kata asli '{word}'")
+        self.prefix_removed = None
+        self.suffix_removed = None
+
+    def as_dict(self, result):
+        return {
+            'original': self.original,
+            'result': result,
+            'prefix_removed': self.prefix_removed,
+            'suffix_removed': self.suffix_removed,
+            'in_dictionary': self.in_dictionary,
+            'steps': self.steps
+        }
+
 def stemming_ays_detailed(word):
     """
     Algoritma stemming AYS dengan detail proses untuk debugging
     Returns: dict dengan informasi lengkap proses stemming
     """
-    original_word = word
-    word = word.lower()
-    
-    process_steps = []
-    removed_prefix = None
-    removed_suffix = None
-    in_dictionary = False
-    
-    # Step 1: Cek apakah sudah kata dasar
-    if word in KAMUS:
-        process_steps.append(f"✓ Kata '{word}' ditemukan di kamus (sudah kata dasar)")
-        return {
-            'original': original_word,
-            'result': word,
-            'prefix_removed': None,
-            'suffix_removed': None,
-            'in_dictionary': True,
-            'steps': process_steps
-        }
-    
-    process_steps.append(f"• Kata '{word}' tidak ada di kamus, mulai proses stemming")
-    
-    prefixes = [
-        'meng', 'meny', 'men', 'mem', 'me',
-        'peng', 'pen', 'pem', 'pe',
-        'ber', 'per', 'di', 'ke', 'se', 'ter'
-    ]
-    
-    suffixes = ['kan', 'an', 'i', 'lah', 'kah', 'nya']
-    
-    # Step 2: Coba hilangkan suffix dulu
-    temp_word = word
-    for s in suffixes:
-        if temp_word.endswith(s):
-            temp_word = temp_word[:-len(s)]
-            removed_suffix = s
-            process_steps.append(f"• Menghapus suffix '-{s}': '{word}' → '{temp_word}'")
-            break
-    
-    # Step 3: Cek hasil setelah hilangkan suffix
-    if temp_word in KAMUS:
-        process_steps.append(f"✓ Hasil '{temp_word}' ditemukan di kamus")
-        return {
-            'original': original_word,
-            'result': temp_word,
-            'prefix_removed': None,
-            'suffix_removed': removed_suffix,
-            'in_dictionary': True,
-            'steps': process_steps
-        }
-    
-    # Step 4: Coba hilangkan prefix
-    for p in prefixes:
-        if temp_word.startswith(p):
-            result = temp_word[len(p):]
-            removed_prefix = p
-            process_steps.append(f"• Menghapus prefix '{p}-': '{temp_word}' → '{result}'")
-            
-            if result in KAMUS:
-                process_steps.append(f"✓ Hasil '{result}' ditemukan di kamus")
-                return {
-                    'original': original_word,
-                    'result': result,
-                    'prefix_removed': removed_prefix,
-                    'suffix_removed': removed_suffix,
-                    'in_dictionary': True,
-                    'steps': process_steps
-                }
-            
-            if len(result) > 2:
-                process_steps.append(f"• Hasil '{result}' tidak di kamus tapi valid (>2 karakter)")
-                return {
-                    'original': original_word,
-                    'result': result,
-                    'prefix_removed': removed_prefix,
-                    'suffix_removed': removed_suffix,
-                    'in_dictionary': False,
-                    'steps': process_steps
-                }
-    
-    # Step 5: Coba urutan terbalik (prefix dulu)
-    temp_word = word
-    for p in prefixes:
-        if temp_word.startswith(p):
-            temp_word = temp_word[len(p):]
-            if removed_prefix is None:
-                removed_prefix = p
-                process_steps.append(f"• Mencoba hapus prefix '{p}-': '{word}' → '{temp_word}'")
-            break
-    
-    if temp_word in KAMUS:
-        process_steps.append(f"✓ Hasil '{temp_word}' ditemukan di kamus")
-        return {
-            'original': original_word,
-            'result': temp_word,
-            'prefix_removed': removed_prefix,
-            'suffix_removed': None,
-            'in_dictionary': True,
-            'steps': process_steps
-        }
-    
-    # Step 6: Hilangkan suffix dari hasil prefix
-    for s in suffixes:
-        if temp_word.endswith(s):
-            result = temp_word[:-len(s)]
-            if removed_suffix is None:
-                removed_suffix = s
-                process_steps.append(f"• Menghapus suffix '-{s}': '{temp_word}' → '{result}'")
-            
-            if result in KAMUS:
-                process_steps.append(f"✓ Hasil '{result}' ditemukan di kamus")
-                return {
-                    'original': original_word,
-                    'result': result,
-                    'prefix_removed': removed_prefix,
-                    'suffix_removed': removed_suffix,
-                    'in_dictionary': True,
-                    'steps': process_steps
-                }
-            
-            if len(result) > 2:
-                process_steps.append(f"• Hasil '{result}' tidak di kamus tapi valid (>2 karakter)")
-                return {
-                    'original': original_word,
-                    'result': result,
-                    'prefix_removed': removed_prefix,
-                    'suffix_removed': removed_suffix,
-                    'in_dictionary': False,
-                    'steps': process_steps
-                }
-    
-    # Final: Return hasil terbaik
-    if len(temp_word) >= 3:
-        process_steps.append(f"• Menggunakan hasil '{temp_word}' (>= 3 karakter)")
-        return {
-            'original': original_word,
-            'result': temp_word,
-            'prefix_removed': removed_prefix,
-            'suffix_removed': removed_suffix,
-            'in_dictionary': False,
-            'steps': process_steps
-        }
-    else:
-        process_steps.append(f"⚠ Tidak dapat di-stem, menggunakan kata asli '{word}'")
-        return {
-            'original': original_word,
-            'result': word,
-            'prefix_removed': None,
-            'suffix_removed': None,
-            'in_dictionary': False,
-            'steps': process_steps
-        }
+    tracer = StemmingTrace(word)
+    result = stemming_ays(word, tracer)
+    return tracer.as_dict(result)
 
 def stemming_process(tokens):
     return [stemming_ays(t) for t in tokens]
@@ -0,0 +1,88 @@
+import tempfile
+from array import array
+
+CHECKPOINT_CHARS = 1024
+
+class TextStore:
+    """
+    Penyimpanan teks dokumen di disk (utf-8), sebagai pengganti menyimpan seluruh
+    teks di memori.
+
+    Semua dokumen ditulis berurutan ke satu file. Untuk setiap dokumen disimpan
+    offset byte setiap CHECKPOINT_CHARS karakter, sehingga potongan teks
+    [start, end) (dalam karakter) cukup dibaca dari checkpoint terdekat tanpa
+    membaca seluruh dokumen.
+    """
+
+    def __init__(self, path=None):
+        # Tanpa path, teks disimpan di file sementara yang terhapus saat ditutup
+        self.file = open(path, 'w+b') if path else tempfile.TemporaryFile()
+        self.docs = {}
+        self.end = 0
+
+    def __len__(self):
+        return len(self.docs)
+
+    def __contains__(self, name):
+        return name in self.docs
+
+    def add(self, name, text):
+        """
+        Simpan teks satu dokumen.
+        """
+        for _ in self.add_stream(name, [text]):
+            pass
+
+    def add_stream(self, name, chunks):
+        """
+        Simpan teks yang datang per potongan sambil meneruskan potongan tersebut,
+        sehingga bisa dipasang di depan preprocess_stream.
+        Yields: potongan teks yang sama dengan input
+        """
+        if name in self.docs:
+            raise ValueError(f"Dokumen '{name}' sudah ada di text store")
+        checkpoints = array('Q')
+        length = 0
+        for chunk in chunks:
+            # seek ulang karena read() bisa dipanggil di sela-sela potongan
+            self.file.seek(self.end)
+            i = 0
+            while i < len(chunk):
+                if length % CHECKPOINT_CHARS == 0:
+                    checkpoints.append(self.end)
+                part = chunk[i:i + CHECKPOINT_CHARS - length % CHECKPOINT_CHARS]
+                data = part.encode('utf-8', 'surrogatepass')
+                self.file.write(data)
+                self.end += len(data)
+                length += len(part)
+                i += len(part)
+            yield chunk
+        self.docs[name] = (checkpoints, self.end, length)
+
+    def length(self, name):
+        """
+        Returns: panjang teks dokumen (karakter)
+        """
+        return self.docs[name][2]
+
+    def read(self, name, start=0, end=None):
+        """
+        Baca teks dokumen pada rentang karakter [start, end).
+        """
+        checkpoints, doc_end, length = self.docs[name]
+        if end is None or end > length:
+            end = length
+        start = max(0, start)
+        if start >= end:
+            return ''
+        first = start // CHECKPOINT_CHARS
+        last = (end - 1) // CHECKPOINT_CHARS + 1
+        byte_start = checkpoints[first]
+        byte_end = checkpoints[last] if last < len(checkpoints) else doc_end
+        self.file.seek(byte_start)
+        text = self.file.read(byte_end - byte_start).decode('utf-8', 'surrogatepass')
+        offset = first * CHECKPOINT_CHARS
+        return text[start - offset:end - offset]
+
+    def close(self):
+        self.file.close()
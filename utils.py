@@ -1,9 +1,12 @@
+import codecs
 from PyPDF2 import PdfReader
 from docx import Document
 
+TXT_ENCODINGS = ['utf-8', 'latin-1', 'cp1252', 'iso-8859-1']
+
 def read_txt(path):
     # Try multiple encodings to handle various file formats
-    encodings = ['utf-8', 'latin-1', 'cp1252', 'iso-8859-1']
+    encodings = TXT_ENCODINGS
     
     for encoding in encodings:
         try:
@@ -16,6 +19,40 @@ def read_txt(path):
     with open(path, "r", encoding="utf-8", errors="ignore") as f:
         return f.read()
 
+def detect_encoding(sample):
+    """
+    Pilih encoding pertama dari TXT_ENCODINGS yang bisa men-decode sample bytes.
+    Sample boleh terpotong di tengah karakter multi-byte.
+    """
+    for encoding in TXT_ENCODINGS:
+        try:
+            codecs.getincrementaldecoder(encoding)().decode(sample, final=False)
+            return encoding
+        except UnicodeDecodeError:
+            continue
+    return 'utf-8'
+
+def stream_txt(path, chunk_size=1 << 20, sample_size=1 << 16):
+    """
+    Baca file teks secara bertahap dengan memori terbatas.
+    File hanya dibaca sekali: encoding dipilih dari sample awal, lalu bytes
+    di-decode per chunk dengan incremental decoder (karakter multi-byte yang
+    terpotong antar chunk tetap utuh). Byte yang tidak valid untuk encoding
+    terpilih diabaikan, sama seperti fallback terakhir read_txt.
+    Yields: potongan teks (str)
+    """
+    with open(path, 'rb') as f:
+        data = f.read(sample_size)
+        decoder = codecs.getincrementaldecoder(detect_encoding(data))(errors='ignore')
+        while data:
+            text = decoder.decode(data, final=False)
+            if text:
+                yield text
+            data = f.read(chunk_size)
+        text = decoder.decode(b'', final=True)
+        if text:
+            yield text
+
 def read_pdf(path):
     try:
         reader = PdfReader(path)